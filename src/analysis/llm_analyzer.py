@@ -1,45 +1,127 @@
+import asyncio
 import json
 import logging
 import os
-import time
-
+import random
+import threading
+import weakref
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
 import pandas as pd
 import streamlit as st  # Needed for caching and secrets
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 # Attempt to import Google GenAI libraries
 try:
+    import httpx
     from google import genai
     from google.api_core import exceptions as google_api_exceptions
+    from google.genai import errors as genai_errors
     from google.genai import types
 
     GENAI_AVAILABLE = True
 except ImportError:
     genai = None
+    httpx = None
     types = None
     google_api_exceptions = None
+    genai_errors = None
     GENAI_AVAILABLE = False
     logging.warning(
         "`google-generativeai` library not installed. LLM features will be unavailable."
     )
     # UI warnings should be handled in app.py based on GENAI_AVAILABLE
 
+# HTTP/2 lets concurrent requests share one connection; it needs the `h2` package
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from analysis.llm_cache import LLMResponseCache
+
 # Import constants from config
 from config import (
     AGENT_SPEAKER_ID,
     # GOOGLE_API_KEY is loaded from config, but secrets take precedence
     GEMINI_MODEL_NAME,
+    LLM_BATCH_SIZE,
+    LLM_CACHE_MEMORY_SIZE,
+    LLM_CACHE_PATH,
+    LLM_CHUNK_OVERLAP,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_MAX_PROMPT_CHARS,
+    LLM_REQUEST_TIMEOUT_MS,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
 )
+from data_loader import sort_call_df
 
 
 # --- Pydantic Models for Response Validation ---
-class ProfanityResult(BaseModel):
+class CallAnalysisResult(BaseModel):
     agent_profanity: str
     borrower_profanity: str
+    agent_violation: str
 
 
-class PrivacyResult(BaseModel):
-    agent_violation: str
+class BatchCallAnalysisResult(CallAnalysisResult):
+    call_number: int
+
+
+# Validators are built once at import; `validate_json` parses in pydantic-core
+_RESULT_ADAPTER = TypeAdapter(CallAnalysisResult)
+_BATCH_RESULTS_ADAPTER = TypeAdapter(list[BatchCallAnalysisResult])
+
+
+# --- Response Cache (keyed by model, prompt and schema) ---
+_RESPONSE_CACHE = LLMResponseCache(LLM_CACHE_PATH, memory_size=LLM_CACHE_MEMORY_SIZE)
+# Per-call results are cached too, keyed by transcript, so that a call is not
+# re-sent just because it is packed with different calls in a batch prompt.
+# Bump the version whenever the prompts change.
+_RESULT_CACHE_VERSION = "1"
+
+
+def _result_cache_key(transcript: str) -> str:
+    return LLMResponseCache.make_key(
+        "call-result", _RESULT_CACHE_VERSION, GEMINI_MODEL_NAME, transcript
+    )
+
+
+def _response_cache_key(
+    contents: str, response_mime_type: str | None, response_schema: Any
+) -> str:
+    return LLMResponseCache.make_key(
+        "validated-answer",
+        GEMINI_MODEL_NAME,
+        contents,
+        str(response_mime_type),
+        repr(response_schema),
+    )
+
+
+def _cache_answer(cache_key: str, adapter: TypeAdapter, result: Any) -> None:
+    """
+    Stores an answer once it has passed validation, re-serialized by its
+    adapter, so that a malformed or truncated reply is never replayed.
+    """
+    _RESPONSE_CACHE.set(cache_key, adapter.dump_json(result).decode())
+
+
+def _get_cached_results(transcript: str) -> dict[str, Any] | None:
+    cached = _RESPONSE_CACHE.get(_result_cache_key(transcript))
+    return json.loads(cached) if cached is not None else None
+
+
+def _cache_results(transcript: str, results: dict[str, Any]) -> None:
+    _RESPONSE_CACHE.set(_result_cache_key(transcript), json.dumps(results))
 
 
 # --- Default LLM Settings ---
@@ -65,40 +147,138 @@ DEFAULT_SAFETY_SETTINGS = (
 )
 
 
-# --- GenAI Client Initialization (Cached) ---
-@st.cache_resource(show_spinner="Connecting to Google GenAI...")
-def get_genai_client():
-    """Initializes and returns the Google GenAI client, cached per session."""
-    if not GENAI_AVAILABLE:
-        logging.error("Attempted to get GenAI client, but library is not available.")
-        return None
+def _get_api_key() -> str | None:
+    """Returns the Google API key, preferring Streamlit secrets over the env."""
+    try:
+        api_key = st.secrets.get("GOOGLE_API_KEY")
+    except FileNotFoundError:  # No secrets.toml configured
+        api_key = None
+    return api_key or os.environ.get("GOOGLE_API_KEY")
+
+
+async def _log_http_version(response) -> None:
+    """httpx response hook: shows whether requests are multiplexed over HTTP/2."""
+    logging.debug(f"Gemini response over {response.http_version}")
+
+
+def _http_options():
+    """HTTP options shared by every GenAI client this module creates."""
+    return types.HttpOptions(
+        timeout=LLM_REQUEST_TIMEOUT_MS,
+        async_client_args={
+            "http2": HTTP2_AVAILABLE,
+            # Keep enough idle connections for a full batch fan-out, so
+            # concurrent requests don't pay for new TLS handshakes
+            "limits": httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            "event_hooks": {"response": [_log_http_version]},
+        },
+    )
 
-    client = None
-    # Prioritize Streamlit secrets, then environment variable
-    api_key = st.secrets.get("GOOGLE_API_KEY") or os.environ.get("GOOGLE_API_KEY")
 
-    if api_key:
+# --- GenAI Client Initialization (Cached) ---
+# Process-wide singleton, shared by every session and worker thread
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client_singleton():
+    """Creates the Google GenAI client once per process; failures are retried."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is not None:
+            return _CLIENT
+
+        # Prioritize Streamlit secrets, then environment variable
+        api_key = _get_api_key()
+        if not api_key:
+            logging.warning(
+                "Google API Key not found in Streamlit Secrets or environment variables."
+            )
+            # Let the caller handle UI error reporting
+            return None
+
         try:
             logging.info("Attempting to initialize Google GenAI Client...")
 
-            client = genai.Client(api_key=api_key)
+            _CLIENT = genai.Client(api_key=api_key, http_options=_http_options())
 
             # Basic verification (optional, might consume quota)
             # _ = client.generate_content("test", generation_config=types.GenerationConfig(max_output_tokens=5))
             logging.info("Google GenAI Client appears initialized.")
-            return client  # Return the model instance directly or a client object if needed
+            return _CLIENT
         except Exception as e:
             logging.error(
                 f"Failed to initialize Google GenAI client/model: {e}", exc_info=True
             )
             # Let the caller handle UI error reporting
             return None
-    else:
-        logging.warning(
-            "Google API Key not found in Streamlit Secrets or environment variables."
-        )
-        # Let the caller handle UI error reporting
+
+
+@st.cache_resource(show_spinner="Connecting to Google GenAI...")
+def get_genai_client():
+    """Returns the process-wide Google GenAI client, or None if unavailable."""
+    if not GENAI_AVAILABLE:
+        logging.error("Attempted to get GenAI client, but library is not available.")
         return None
+    return _get_client_singleton()
+
+
+# --- Async Client / Event Loop Helpers ---
+# httpx connection pools are bound to the event loop that opened them, so async
+# clients are kept per loop instead of being shared across `asyncio.run` calls.
+# Pooling therefore only pays off within one `async_session` (a batch run);
+# single-file analyses each get a fresh loop, and so a fresh connection.
+_ASYNC_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def _get_async_client():
+    """Returns the Google GenAI async client bound to the running event loop."""
+    if not GENAI_AVAILABLE:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        api_key = _get_api_key()
+        if not api_key:
+            return None
+        # One client (and connection pool) per loop, reused by every call on it
+        client = genai.Client(api_key=api_key, http_options=_http_options())
+        _ASYNC_CLIENTS[loop] = client
+    return client.aio
+
+
+async def _close_async_client() -> None:
+    """Closes the async client of the running event loop, if one was opened."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aio.aclose()
+
+
+@contextmanager
+def async_session() -> Iterator[asyncio.Runner]:
+    """
+    An event loop that synchronous code can drive in several `run` steps (e.g.
+    from a generator); the loop's async client is closed on exit.
+    """
+    with asyncio.Runner() as runner:
+        try:
+            yield runner
+        finally:
+            runner.run(_close_async_client())
+
+
+def run_async(coro):
+    """
+    Runs an LLM coroutine to completion from synchronous (Streamlit) code, on a
+    loop of its own. The loop stays on the calling thread so the coroutine's
+    `st.warning`/`st.error` calls keep the script run context; the price is
+    that nothing is pooled across calls (one request per call anyway).
+    """
+    with async_session() as runner:
+        return runner.run(coro)
 
 
 # --- LLM Helper Functions ---
@@ -106,35 +286,79 @@ def _format_transcript_for_llm(call_df: pd.DataFrame) -> str:
     """Formats the DataFrame transcript into a string for the LLM prompt."""
     if call_df is None or call_df.empty:
         return ""
-    transcript = []
-    # Ensure sorting by time
-    call_df_sorted = call_df.sort_values(by="stime")
-    for _, row in call_df_sorted.iterrows():
-        speaker_label = "Agent" if row["speaker"] == AGENT_SPEAKER_ID else "Customer"
-        text_content = (
-            str(row["text"]) if pd.notna(row["text"]) else "[empty utterance]"
-        )
-        transcript.append(f"{speaker_label}: {text_content}")
-    return "\n".join(transcript)
+    call_df_sorted = sort_call_df(call_df)
+    # Build all "Speaker: text" lines at once instead of row by row
+    speaker_labels = np.where(
+        call_df_sorted["speaker"].to_numpy() == AGENT_SPEAKER_ID, "Agent", "Customer"
+    )
+    text_contents = call_df_sorted["text"].fillna("[empty utterance]").astype(str)
+    return (speaker_labels + ": " + text_contents).str.cat(sep="\n")
+
+
+def _is_retryable_error(error: Exception) -> bool:
+    """Rate limits (429) and server-side errors (5xx) are worth retrying."""
+    if google_api_exceptions and isinstance(
+        error,
+        (
+            google_api_exceptions.ResourceExhausted,
+            google_api_exceptions.InternalServerError,
+            google_api_exceptions.ServiceUnavailable,
+        ),
+    ):
+        return True
+    if genai_errors and isinstance(error, genai_errors.APIError):
+        return error.code == 429 or (error.code or 0) >= 500
+    return False
 
 
-def _call_gemini_api_sdk(
+def _retry_delay(
+    attempt: int, base_delay: float, error: Exception | None = None
+) -> float:
+    """
+    Seconds to wait before retrying: exponential backoff with full jitter, so
+    concurrent requests don't retry in lockstep. A numeric `Retry-After` header
+    sent by the server takes precedence.
+    """
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after")
+    if retry_after:
+        try:
+            return min(LLM_RETRY_MAX_DELAY, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, base_delay * 2**attempt))
+
+
+async def _call_gemini_api_sdk_async(
     contents: str,
     generation_config: types.GenerationConfig | None = None,
     safety_settings: list[types.SafetySetting] | None = None,  # Default to None here
     response_mime_type: str | None = None,
     response_schema: str | None = None,
     max_retries: int = 2,
-    delay: int = 5,
-) -> str | None:
+    delay: float = LLM_RETRY_BASE_DELAY,
+) -> Any:
     """
-    Helper function to call the Gemini API using google-genai SDK
+    Helper coroutine to call the Gemini API using the google-genai async SDK
     with error handling and retries.
+
+    Returns the response text, or None on failure. When a `response_schema` is
+    given and the SDK has already decoded the structured output, the parsed
+    object (`response.parsed`) is returned instead; see `_validate_answer`.
+
+    Identical requests are answered from the response cache. Responses are not
+    cached here: callers store them with `_cache_answer` once validated.
     """
+    cache_key = _response_cache_key(contents, response_mime_type, response_schema)
+    cached_text = _RESPONSE_CACHE.get(cache_key)
+    if cached_text is not None:
+        logging.info("Using cached Gemini response.")
+        return cached_text
+
     # Assign the actual default inside the function
     if safety_settings is None:
         safety_settings = DEFAULT_SAFETY_SETTINGS
-    genai_client = get_genai_client()
+    genai_client = _get_async_client()
 
     if not genai_client or not types or not genai:
         if "genai_client_error_shown" not in st.session_state:
@@ -150,17 +374,6 @@ def _call_gemini_api_sdk(
     if "genai_client_error_shown" in st.session_state:
         del st.session_state["genai_client_error_shown"]
 
-    # Ensure client and types are available (check genai_client specifically)
-    if not genai_client or not types or not genai:
-        # Avoid showing duplicate errors if client failed initialization
-        if "genai_client_error_shown" not in st.session_state:
-            st.error("Google GenAI client is not configured. Cannot call LLM.")
-            st.session_state.genai_client_error_shown = True
-        logging.error(
-            "Attempted to call Gemini API, but client/types are not configured."
-        )
-        return None
-
     try:
         config_dict = {}
         if generation_config:
@@ -189,7 +402,7 @@ def _call_gemini_api_sdk(
         response = None
         for attempt in range(max_retries + 1):
             try:
-                response = genai_client.models.generate_content(
+                response = await genai_client.models.generate_content(
                     model=model_path, contents=contents, config=api_config
                 )
                 logging.info(f"Received response from Gemini (attempt {attempt + 1}).")
@@ -207,7 +420,7 @@ def _call_gemini_api_sdk(
                         logging.info(
                             f"Retrying LLM call (attempt {attempt + 2}/{max_retries + 1}) after empty candidates..."
                         )
-                        time.sleep(delay)
+                        await asyncio.sleep(_retry_delay(attempt, delay))
                         continue
                     else:
                         st.warning(
@@ -218,6 +431,10 @@ def _call_gemini_api_sdk(
                 try:
                     response_text = response.text
                     logging.debug(f"LLM Raw Response Text: {response_text[:200]}...")
+                    # The SDK already decoded structured output; don't parse it twice
+                    parsed = getattr(response, "parsed", None)
+                    if response_schema is not None and parsed is not None:
+                        return parsed
                     return response_text  # SUCCESS
                 except ValueError as ve:
                     logging.warning(
@@ -228,30 +445,27 @@ def _call_gemini_api_sdk(
                     )
                     return None  # Failed
 
-            except (
-                google_api_exceptions.ResourceExhausted,
-                google_api_exceptions.InternalServerError,
-                google_api_exceptions.ServiceUnavailable,
-            ) as api_error:
+            except Exception as e:
+                if not _is_retryable_error(e):
+                    logging.error(
+                        f"Unexpected Error calling Gemini API (attempt {attempt + 1}/{max_retries + 1}): {e}",
+                        exc_info=True,
+                    )
+                    st.error(f"LLM API call failed unexpectedly: {e}")
+                    return None  # Failed on unexpected error
                 logging.warning(
-                    f"API Error (attempt {attempt + 1}/{max_retries + 1}): {type(api_error).__name__} - {api_error}"
+                    f"API Error (attempt {attempt + 1}/{max_retries + 1}): {type(e).__name__} - {e}"
                 )
                 if attempt < max_retries:
-                    logging.info(f"Retrying LLM call in {delay}s...")
-                    time.sleep(delay)
+                    retry_delay = _retry_delay(attempt, delay, e)
+                    logging.info(f"Retrying LLM call in {retry_delay:.1f}s...")
+                    await asyncio.sleep(retry_delay)
                 else:
                     st.error(
-                        f"LLM API call failed after {max_retries + 1} attempts due to {type(api_error).__name__}."
+                        f"LLM API call failed after {max_retries + 1} attempts due to {type(e).__name__}."
                     )
-                    logging.error(f"LLM API call failed definitively: {api_error}")
+                    logging.error(f"LLM API call failed definitively: {e}")
                     return None
-            except Exception as e:
-                logging.error(
-                    f"Unexpected Error calling Gemini API (attempt {attempt + 1}/{max_retries + 1}): {e}",
-                    exc_info=True,
-                )
-                st.error(f"LLM API call failed unexpectedly: {e}")
-                return None  # Failed on unexpected error
 
     except Exception as e:
         logging.error(
@@ -266,20 +480,125 @@ def _call_gemini_api_sdk(
 # --- LLM Analysis Functions ---
 
 
-def detect_profanity_llm(call_df: pd.DataFrame) -> tuple[bool, bool]:
-    agent_profane = False
-    borrower_profane = False
+def _validate_answer(answer: Any, adapter: TypeAdapter) -> Any:
+    """
+    Validates an LLM answer that is either raw JSON text (e.g. from the response
+    cache) or an object the SDK already parsed from structured output.
+    """
+    if isinstance(answer, str):
+        return adapter.validate_json(answer)
+    return adapter.validate_python(answer)
+
+
+def _answer_to_results(result: CallAnalysisResult) -> dict[str, bool]:
+    """Converts the Yes/No answers of the LLM into batch result flags."""
+    agent_answer = result.agent_profanity.strip().lower()
+    borrower_answer = result.borrower_profanity.strip().lower()
+    violation_answer = result.agent_violation.strip().lower()
+    return {
+        "agent_profanity_llm": agent_answer == "yes",
+        "borrower_profanity_llm": borrower_answer == "yes",
+        "privacy_violation_llm": violation_answer == "yes",
+    }
+
+
+def _empty_results() -> dict[str, Any]:
+    """LLM flags for a call that has not been flagged (or could not be checked)."""
+    return {
+        "agent_profanity_llm": False,
+        "borrower_profanity_llm": False,
+        "privacy_violation_llm": False,
+    }
+
+
+def _chunk_transcript(
+    transcript: str, max_chars: int, overlap: float = LLM_CHUNK_OVERLAP
+) -> list[str]:
+    """
+    Splits a transcript into windows of whole lines, each at most `max_chars`
+    long and starting with the last ~`overlap` of the previous window, so that
+    context at the boundaries is not lost. The split is deterministic, which
+    keeps every chunk's response-cache key stable.
+    """
+    # A single line longer than a window is truncated
+    lines = [line[:max_chars] for line in transcript.split("\n")]
+    chunks = []
+    start = 0
+    while True:
+        end, size = start, 0
+        while end < len(lines) and (
+            end == start or size + len(lines[end]) + 1 <= max_chars
+        ):
+            size += len(lines[end]) + 1
+            end += 1
+        chunks.append("\n".join(lines[start:end]))
+        if end >= len(lines):
+            return chunks
+        # Step back over the last lines so the next window overlaps this one
+        next_start, kept = end, 0
+        while (
+            next_start - 1 > start
+            and kept + len(lines[next_start - 1]) + 1 <= overlap * max_chars
+        ):
+            next_start -= 1
+            kept += len(lines[next_start]) + 1
+        start = next_start
+
+
+async def analyze_call_llm(call_df: pd.DataFrame) -> dict[str, Any]:
+    """
+    Checks one call for profanity and privacy violations with a single Gemini
+    request, so the transcript is only sent once. Transcripts longer than
+    `LLM_MAX_PROMPT_CHARS` are split into overlapping chunks that are checked
+    concurrently; a flag is set if any chunk raises it.
+
+    Returns a dictionary keyed like the batch results. Flags default to False
+    when the LLM cannot be reached or its answer cannot be parsed.
+    """
+    results = _empty_results()
     if call_df is None or call_df.empty:
-        return agent_profane, borrower_profane
+        return results
     if not get_genai_client():
-        return agent_profane, borrower_profane  # Cannot run if client failed init
+        return results  # Cannot run if client failed init
 
     transcript = _format_transcript_for_llm(call_df)
     if not transcript:
-        logging.warning("LLM Profanity: Transcript empty.")
-        return agent_profane, borrower_profane
-    prompt = f"""Analyze the following debt collection call transcript for profanity.
+        logging.warning("LLM Analysis: Transcript empty.")
+        return results
+    cached = _get_cached_results(transcript)
+    if cached is not None:
+        return cached
+
+    if len(transcript) <= LLM_MAX_PROMPT_CHARS:
+        chunk_results = [await _analyze_transcript_llm(transcript)]
+    else:
+        # Bounded prompt size (cost/latency, context window) at the price of
+        # seeing less context at once, e.g. a verification in an earlier chunk
+        chunks = _chunk_transcript(transcript, LLM_MAX_PROMPT_CHARS)
+        logging.info(
+            f"LLM Analysis: Transcript of {len(transcript)} chars split into {len(chunks)} chunks."
+        )
+        chunk_results = await asyncio.gather(
+            *(_analyze_transcript_llm(chunk) for chunk in chunks)
+        )
+    # Unanswered chunks count as unflagged; such results are not cached
+    answered = [r for r in chunk_results if r is not None]
+    results = {key: any(r[key] for r in answered) for key in results}
+    if len(answered) == len(chunk_results):
+        _cache_results(transcript, results)
+    return results
+
+
+async def _analyze_transcript_llm(transcript: str) -> dict[str, Any] | None:
+    """
+    Sends one formatted transcript (or chunk of one) to Gemini for all checks.
+    Returns None when no usable answer came back.
+    """
+    prompt = f"""Analyze the following debt collection call transcript for profanity and for a potential privacy violation by the Agent.
     Profanity includes strong swear words and insults (e.g., 'fuck', 'shit', 'asshole', 'bitch', 'damn').
+    It is considered a privacy violation when agents have shared sensitive information like balance
+    or account details without the identity verification (i.e. without verification of date
+    of birth or address or Social Security Number or some personal identifier).
 
     Transcript:
     ---
@@ -289,91 +608,229 @@ def detect_profanity_llm(call_df: pd.DataFrame) -> tuple[bool, bool]:
     Based **only** on the transcript provided:
     1. Did the **Agent** use any profane language? Answer "Yes" or "No".
     2. Did the **Customer** use any profane language? Answer "Yes" or "No".
+    3. Did the **Agent** have any privacy or compliance violation? Answer "Yes" or "No".
 
     Return the answer **only** in JSON format conforming to the following schema:
     {{
     "agent_profanity": "string (Yes/No)",
-    "borrower_profanity": "string (Yes/No)"
+    "borrower_profanity": "string (Yes/No)",
+    "agent_violation": "string (Yes/No)"
     }}
     """
 
-    response_text = _call_gemini_api_sdk(
+    answer = await _call_gemini_api_sdk_async(
         contents=prompt,
         response_mime_type="application/json",
-        response_schema=ProfanityResult,
+        response_schema=CallAnalysisResult,
     )
 
-    if response_text:
+    if answer:
         try:
-            result = ProfanityResult.model_validate_json(response_text)
-            agent_answer = result.agent_profanity.strip().lower()
-            borrower_answer = result.borrower_profanity.strip().lower()
-            agent_profane = agent_answer == "yes"
-            borrower_profane = borrower_answer == "yes"
-            logging.info(
-                f"LLM Profanity Result (Pydantic validated): Agent={agent_profane}, Borrower={borrower_profane}"
+            result = _validate_answer(answer, _RESULT_ADAPTER)
+            _cache_answer(
+                _response_cache_key(prompt, "application/json", CallAnalysisResult),
+                _RESULT_ADAPTER,
+                result,
             )
-        except json.JSONDecodeError as e:
+            results = _empty_results() | _answer_to_results(result)
+            logging.info(f"LLM Analysis Result (Pydantic validated): {results}")
+            return results
+        except ValidationError as e:
+            # Raised for invalid JSON too; the answer may be a parsed object
             logging.error(
-                f"LLM Profanity JSON Decode Error: {e}. Response: {response_text[:200]}..."
-            )
-            st.warning(
-                f"LLM profanity response wasn't valid JSON: '{response_text[:100]}...'"
+                f"LLM Analysis Validation Error: {e}. Response: {repr(answer)[:200]}..."
             )
+            st.warning(f"LLM response wasn't valid JSON: '{repr(answer)[:100]}...'")
         except Exception as e:
-            logging.error(f"LLM Profanity Processing Error: {e}", exc_info=True)
-            st.warning(f"Error processing LLM profanity response: {e}")
-    return agent_profane, borrower_profane
+            logging.error(f"LLM Analysis Processing Error: {e}", exc_info=True)
+            st.warning(f"Error processing LLM response: {e}")
+    return None
 
 
-def detect_privacy_violation_llm(call_df: pd.DataFrame) -> bool:
-    violation_detected = False
-    if call_df is None or call_df.empty:
-        return violation_detected
-    if not get_genai_client():
-        return violation_detected
+async def detect_batch_llm(call_dfs: list[pd.DataFrame]) -> list[dict[str, Any]]:
+    """
+    Checks several calls with a single Gemini request by packing their
+    transcripts into one prompt, amortizing the instructions and schema.
 
-    transcript = _format_transcript_for_llm(call_df)
-    if not transcript:
-        logging.warning("LLM Privacy: Transcript empty.")
-        return violation_detected
-    prompt = f"""Analyze the following debt collection call transcript for a potential privacy violation by the Agents.
-    It is considered a violation  when agents have shared sensitive information like balance
+    Returns one `analyze_call_llm`-style result per input DataFrame, in order.
+    Calls missing from the LLM answer are re-checked individually.
+    """
+    if len(call_dfs) == 1:
+        return [await analyze_call_llm(call_dfs[0])]
+
+    results = [_empty_results() for _ in call_dfs]
+    if not get_genai_client():
+        return results
+
+    # Calls are numbered from 1 in the prompt; empty transcripts are skipped.
+    # Calls that would push the packed prompt past the size limit are checked
+    # on their own instead (where long transcripts get chunked).
+    # Calls with a cached result are left out of the prompt.
+    sections = []
+    transcripts_by_number = {}
+    pending = set()
+    deferred = set()
+    prompt_chars = 0
+    for number, call_df in enumerate(call_dfs, start=1):
+        transcript = _format_transcript_for_llm(call_df)
+        if not transcript:
+            continue
+        cached = _get_cached_results(transcript)
+        if cached is not None:
+            results[number - 1] = cached
+            continue
+        transcripts_by_number[number] = transcript
+        if prompt_chars + len(transcript) > LLM_MAX_PROMPT_CHARS:
+            deferred.add(number)
+            continue
+        sections.append(f"=== CALL {number} ===\n{transcript}")
+        pending.add(number)
+        prompt_chars += len(transcript)
+    if not pending and not deferred:
+        return results
+    transcripts = "\n".join(sections)
+    prompt = f"""Analyze each of the following debt collection call transcripts for profanity and for a potential privacy violation by the Agent.
+    Profanity includes strong swear words and insults (e.g., 'fuck', 'shit', 'asshole', 'bitch', 'damn').
+    It is considered a privacy violation when agents have shared sensitive information like balance
     or account details without the identity verification (i.e. without verification of date
     of birth or address or Social Security Number or some personal identifier).
 
-    Transcript:
+    Transcripts:
     ---
-    {transcript}
+    {transcripts}
     ---
 
-    Based **only** on the transcript provided:
-    1. Did the **Agent** had any privacy or compliance Violation? Answer "Yes" or "No".
+    Based **only** on each transcript, independently of the others:
+    1. Did the **Agent** use any profane language? Answer "Yes" or "No".
+    2. Did the **Customer** use any profane language? Answer "Yes" or "No".
+    3. Did the **Agent** have any privacy or compliance violation? Answer "Yes" or "No".
 
-    Return the answer **only** in JSON format conforming to the following schema:
-    {{
-    "agent_violation": "string (Yes/No)",
-    }}
+    Return the answer **only** as a JSON list with one object per call, conforming to the following schema:
+    [{{
+    "call_number": "integer (the N of '=== CALL N ===')",
+    "agent_profanity": "string (Yes/No)",
+    "borrower_profanity": "string (Yes/No)",
+    "agent_violation": "string (Yes/No)"
+    }}]
     """
-    response_text = _call_gemini_api_sdk(
-        contents=prompt,
-        response_mime_type="application/json",
-        response_schema=PrivacyResult,
-    )
-    if response_text:
+
+    answer = None
+    if pending:
+        answer = await _call_gemini_api_sdk_async(
+            contents=prompt,
+            response_mime_type="application/json",
+            response_schema=list[BatchCallAnalysisResult],
+        )
+
+    if answer:
         try:
-            result = PrivacyResult.model_validate_json(response_text)
-            agent_answer = result.agent_violation.strip().lower()
-            violation_detected = agent_answer == "yes"
-            logging.info(f"LLM Privacy Result: Agent={violation_detected}")
-        except json.JSONDecodeError as e:
-            logging.error(
-                f"LLM Privacy JSON Decode Error: {e}. Response: {response_text[:200]}..."
+            batch_results = _validate_answer(answer, _BATCH_RESULTS_ADAPTER)
+            _cache_answer(
+                _response_cache_key(
+                    prompt, "application/json", list[BatchCallAnalysisResult]
+                ),
+                _BATCH_RESULTS_ADAPTER,
+                batch_results,
             )
-            st.warning(
-                f"LLM Privacy response wasn't valid JSON: '{response_text[:100]}...'"
+            for result in batch_results:
+                if result.call_number in pending:
+                    call_results = results[result.call_number - 1]
+                    call_results.update(_answer_to_results(result))
+                    _cache_results(
+                        transcripts_by_number[result.call_number], call_results
+                    )
+                    pending.discard(result.call_number)
+            logging.info(
+                f"LLM Batch Result: {len(call_dfs) - len(pending)}/{len(call_dfs)} calls answered."
             )
         except Exception as e:
-            logging.error(f"LLM Privacy Processing Error: {e}", exc_info=True)
-            st.warning(f"Error processing LLM Privacy response: {e}")
-    return violation_detected
+            logging.error(f"LLM Batch Processing Error: {e}", exc_info=True)
+
+    # Fall back to one request per call for anything the batch answer missed
+    if pending or deferred:
+        missing = sorted(pending | deferred)
+        logging.warning(f"LLM Batch: Re-checking calls {missing} individually.")
+        retried = await asyncio.gather(
+            *(analyze_call_llm(call_dfs[number - 1]) for number in missing)
+        )
+        for number, result in zip(missing, retried):
+            results[number - 1] = result
+    return results
+
+
+async def analyze_calls_llm(
+    call_dfs: dict[str, pd.DataFrame],
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+    batch_size: int = LLM_BATCH_SIZE,
+    on_result: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Runs the LLM checks for many calls. Calls are packed `batch_size` at a time
+    into one request, and at most `max_concurrency` requests are kept in
+    flight so the batch stays within the Gemini per-minute quota.
+
+    Args:
+        call_dfs: Mapping of call_id to call transcript DataFrame.
+        max_concurrency: Maximum number of Gemini requests at the same time.
+        batch_size: Number of transcripts sent per Gemini request.
+        on_result: Optional function called with (call_id, results) as each
+                   call finishes, e.g. to report progress.
+
+    Returns:
+        A dictionary mapping call_id to the `analyze_call_llm` results.
+    """
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    batch_size = max(1, batch_size)
+
+    async def _analyze_group(group: list[str]) -> list[dict[str, Any]]:
+        async with sem:
+            group_results = await detect_batch_llm([call_dfs[c] for c in group])
+        if on_result:
+            for call_id, result in zip(group, group_results):
+                try:
+                    on_result(call_id, result)
+                except Exception as cb_e:
+                    logging.warning(f"LLM result callback failed: {cb_e}")
+        return group_results
+
+    call_ids = list(call_dfs)
+    groups = [call_ids[i : i + batch_size] for i in range(0, len(call_ids), batch_size)]
+    outcomes = await asyncio.gather(
+        *(_analyze_group(group) for group in groups), return_exceptions=True
+    )
+    results = {}
+    for group, outcome in zip(groups, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"LLM analysis failed for calls {group}: {outcome}")
+            outcome = [
+                {
+                    "agent_profanity_llm": None,
+                    "borrower_profanity_llm": None,
+                    "privacy_violation_llm": None,
+                    "llm_error": str(outcome),
+                }
+                for _ in group
+            ]
+        results.update(zip(group, outcome))
+    return results
+
+
+# --- Synchronous Entry Points (Streamlit) ---
+
+
+def analyze_all_llm(call_df: pd.DataFrame) -> dict[str, Any]:
+    """
+    Runs every LLM check of one call with a single Gemini request; returns the
+    `agent_profanity_llm`, `borrower_profanity_llm` and `privacy_violation_llm`
+    flags.
+    """
+    return run_async(analyze_call_llm(call_df))
+
+
+def detect_profanity_llm(call_df: pd.DataFrame) -> tuple[bool, bool]:
+    results = analyze_all_llm(call_df)
+    return results["agent_profanity_llm"], results["borrower_profanity_llm"]
+
+
+def detect_privacy_violation_llm(call_df: pd.DataFrame) -> bool:
+    return analyze_all_llm(call_df)["privacy_violation_llm"]
@@ -0,0 +1,86 @@
+# analysis/llm_cache.py
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class LLMResponseCache:
+    """
+    Two-level cache for raw LLM response text: a bounded in-memory LRU in front
+    of a SQLite table on disk, so unchanged prompts are never re-sent, even
+    across app restarts.
+    """
+
+    def __init__(self, path: str, memory_size: int = 1024):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_disabled = False
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Builds a cache key from the model name, prompt and schema."""
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def _get_conn(self) -> sqlite3.Connection | None:
+        # Called with the lock held; disk errors degrade to memory-only caching
+        if self._conn is None and not self._disk_disabled:
+            try:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"LLM disk cache unavailable ({self.path}): {e}")
+                self._conn = None
+                self._disk_disabled = True
+        return self._conn
+
+    def _remember(self, key: str, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response for `key`, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            conn = self._get_conn()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logging.warning(f"LLM disk cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Stores a response in memory and on disk."""
+        with self._lock:
+            self._remember(key, value)
+            conn = self._get_conn()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                    (key, value),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"LLM disk cache write failed: {e}")
@@ -1,51 +1,207 @@
-from collections import defaultdict
+import contextlib
+import threading
+from typing import Any, NamedTuple
 
+import numpy as np
 import pandas as pd
 
+from config import AGENT_SPEAKER_ID, BORROWER_SPEAKER_ID
 
-def calculate_call_metrics(call_df: pd.DataFrame) -> tuple[float, float, float]:
+# Numba is optional: when installed, the sweep-line kernel is JIT-compiled
+try:
+    from numba import njit, prange, set_num_threads, threading_layer
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    threading_layer = None
+    prange = range
+    set_num_threads = None
+    NUMBA_AVAILABLE = False
+
+
+def _sweep_line_numpy(
+    starts: np.ndarray, ends: np.ndarray, is_agent: np.ndarray, is_borrower: np.ndarray
+) -> tuple[float, float]:
+    """
+    Returns (merged speech, overtalk) durations of the given utterances, where
+    overtalk is time during which the agent and the borrower both speak.
+    """
+    # Sweep line: +1 at each start, -1 at each end, active counts between events
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([
+        np.ones(len(starts), dtype=np.int64),
+        -np.ones(len(ends), dtype=np.int64),
+    ])
+    order = np.argsort(times, kind="stable")
+    deltas = deltas[order]
+    event_is_agent = np.concatenate([is_agent, is_agent])[order]
+    event_is_borrower = np.concatenate([is_borrower, is_borrower])[order]
+    active_any = np.cumsum(deltas)[:-1] > 0
+    active_agent = np.cumsum(deltas * event_is_agent)[:-1] > 0
+    active_borrower = np.cumsum(deltas * event_is_borrower)[:-1] > 0
+    segment_durations = np.diff(times[order])
+    merged = float(segment_durations[active_any].sum())
+    overlap = float(segment_durations[active_agent & active_borrower].sum())
+    return merged, overlap
+
+
+def _sweep_line_loop(
+    starts: np.ndarray, ends: np.ndarray, is_agent: np.ndarray, is_borrower: np.ndarray
+) -> tuple[float, float]:
+    """Single-pass sweep merging the sorted starts and ends, meant for `njit`."""
+    n = starts.shape[0]
+    start_order = np.argsort(starts)
+    end_order = np.argsort(ends)
+    merged = 0.0
+    overlap = 0.0
+    # Counts rather than bits: a speaker's own utterances may overlap
+    active = 0
+    agent_active = 0
+    borrower_active = 0
+    last_time = 0.0
+    i = 0
+    j = 0
+    while j < n:  # Nothing is spoken after the last end
+        if i < n and starts[start_order[i]] <= ends[end_order[j]]:
+            k = start_order[i]
+            event_time = starts[k]
+            delta = 1
+            i += 1
+        else:
+            k = end_order[j]
+            event_time = ends[k]
+            delta = -1
+            j += 1
+        segment = event_time - last_time
+        if active > 0:
+            merged += segment
+        overlap += segment * ((agent_active > 0) & (borrower_active > 0))
+        active += delta
+        agent_active += delta * is_agent[k]
+        borrower_active += delta * is_borrower[k]
+        last_time = event_time
+    return merged, overlap
+
+
+_sweep_line = (
+    njit(cache=True, fastmath=True)(_sweep_line_loop)
+    if NUMBA_AVAILABLE
+    else _sweep_line_numpy
+)
+
+
+def _sweep_lines_loop(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    is_agent: np.ndarray,
+    is_borrower: np.ndarray,
+    offsets: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Runs `_sweep_line` over many calls concatenated into flat arrays; call `i`
+    is the slice `offsets[i]:offsets[i + 1]`. Calls are spread over threads
+    when compiled with `parallel=True`.
+    """
+    n_calls = offsets.shape[0] - 1
+    merged = np.zeros(n_calls)
+    overlap = np.zeros(n_calls)
+    for i in prange(n_calls):
+        lo = offsets[i]
+        hi = offsets[i + 1]
+        merged[i], overlap[i] = _sweep_line(
+            starts[lo:hi], ends[lo:hi], is_agent[lo:hi], is_borrower[lo:hi]
+        )
+    return merged, overlap
+
+
+_sweep_lines = (
+    njit(cache=True, parallel=True)(_sweep_lines_loop)
+    if NUMBA_AVAILABLE
+    else _sweep_lines_loop
+)
+
+if NUMBA_AVAILABLE:
+    # Load (or compile) the kernels now rather than inside the first analysis
+    _sweep_line(
+        np.zeros(1), np.ones(1), np.ones(1, dtype=np.int64), np.ones(1, dtype=np.int64)
+    )
+    _sweep_lines(
+        np.zeros(1),
+        np.ones(1),
+        np.ones(1, dtype=np.int64),
+        np.ones(1, dtype=np.int64),
+        np.array([0, 1]),
+    )
+
+# The threading layer is chosen through Numba's environment variables (see
+# config). Its `workqueue` layer is not thread-safe: concurrent calls of the
+# parallel kernel can abort the process, so they take turns
+_sweep_lines_lock = (
+    threading.Lock()
+    if NUMBA_AVAILABLE and threading_layer() == "workqueue"
+    else contextlib.nullcontext()
+)
+
+
+def set_kernel_threads(count: int) -> None:
+    """Caps the threads of the parallel metrics kernel (no-op without Numba)."""
+    if NUMBA_AVAILABLE:
+        set_num_threads(count)
+
+
+class _SweepInputs(NamedTuple):
+    """A call's cleaned utterances, ready for the sweep-line kernels."""
+
+    starts: np.ndarray
+    ends: np.ndarray
+    is_agent: np.ndarray
+    is_borrower: np.ndarray
+    total_duration: float
+
+
+def _sweep_inputs(
+    call_df: pd.DataFrame,
+) -> tuple[tuple[float, float, float] | None, _SweepInputs | None]:
+    """
+    Cleans a call's timings. Returns (final metrics, None) when there is
+    nothing to sweep, else (None, sweep inputs).
+    """
     if call_df is None or call_df.empty:
-        return 0.0, 0.0, 0.0
-    call_df = call_df.sort_values(by="stime").reset_index(drop=True)
-    call_df = call_df.dropna(subset=["stime", "etime"])
-    call_df = call_df[pd.to_numeric(call_df["stime"], errors="coerce").notna()]
-    call_df = call_df[pd.to_numeric(call_df["etime"], errors="coerce").notna()]
-    call_df["stime"] = call_df["stime"].astype(float)
-    call_df["etime"] = call_df["etime"].astype(float)
-    call_df = call_df[call_df["etime"] >= call_df["stime"]]
-    if call_df.empty:
-        return 0.0, 0.0, 0.0
-    min_start_time = call_df["stime"].min()
-    max_end_time = call_df["etime"].max()
-    total_duration = max_end_time - min_start_time
+        return (0.0, 0.0, 0.0), None
+    # Plain arrays rather than pandas filtering: for parsed transcripts the
+    # times are already float64, so these are views. No sorting needed, the
+    # sweep line orders the start/end events itself
+    starts = pd.to_numeric(call_df["stime"], errors="coerce").to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+    ends = pd.to_numeric(call_df["etime"], errors="coerce").to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+    speakers = call_df["speaker"].to_numpy()
+    valid = ends >= starts  # Also False where either time is missing
+    if not valid.all():
+        starts, ends, speakers = starts[valid], ends[valid], speakers[valid]
+    if starts.size == 0:
+        return (0.0, 0.0, 0.0), None
+    total_duration = ends.max() - starts.min()
     if total_duration <= 0:
-        is_silent = (call_df["etime"] - call_df["stime"]).sum() == 0
-        return 0.0, 100.0 if is_silent else 0.0, 0.0
-    intervals = sorted([(row["stime"], row["etime"]) for _, row in call_df.iterrows()])
-    timeline = defaultdict(int)
-    for start, end in intervals:
-        start = max(min_start_time, start)
-        end = min(max_end_time, end)
-        if end > start:
-            timeline[start] += 1
-            timeline[end] -= 1
-    active_speakers = 0
-    last_time = min_start_time
-    merged_speech_duration = 0.0
-    overlap_duration = 0.0
-    sorted_times = sorted(timeline.keys())
-    for t in sorted_times:
-        if t < last_time:
-            continue
-        segment_duration = t - last_time
-        if active_speakers > 0:
-            merged_speech_duration += segment_duration
-            if active_speakers > 1:
-                overlap_duration += segment_duration
-        active_speakers += timeline[t]
-        last_time = t
-        if active_speakers < 0:
-            active_speakers = 0  # Safety reset
+        is_silent = (ends - starts).sum() == 0
+        return (0.0, 100.0 if is_silent else 0.0, 0.0), None
+    spoken = ends > starts  # Zero-length utterances add no speech time
+    starts, ends, speakers = starts[spoken], ends[spoken], speakers[spoken]
+    return None, _SweepInputs(
+        starts,
+        ends,
+        (speakers == AGENT_SPEAKER_ID).astype(np.int64),
+        (speakers == BORROWER_SPEAKER_ID).astype(np.int64),
+        total_duration,
+    )
+
+
+def _metrics_from_sweep(
+    merged_speech_duration: float, overlap_duration: float, total_duration: float
+) -> tuple[float, float, float]:
     overtalk_pct = (
         (overlap_duration / total_duration) * 100 if total_duration > 0 else 0.0
     )
@@ -56,3 +212,51 @@ def calculate_call_metrics(call_df: pd.DataFrame) -> tuple[float, float, float]:
     overtalk_pct = max(0.0, min(100.0, overtalk_pct))
     silence_pct = max(0.0, min(100.0, silence_pct))
     return overtalk_pct, silence_pct, total_duration
+
+
+def calculate_call_metrics(call_df: pd.DataFrame) -> tuple[float, float, float]:
+    final_metrics, inputs = _sweep_inputs(call_df)
+    if inputs is None:
+        return final_metrics
+    merged_speech_duration, overlap_duration = _sweep_line(
+        inputs.starts, inputs.ends, inputs.is_agent, inputs.is_borrower
+    )
+    return _metrics_from_sweep(
+        merged_speech_duration, overlap_duration, inputs.total_duration
+    )
+
+
+def calculate_call_metrics_batch(
+    call_dfs: list[pd.DataFrame],
+) -> list[tuple[float, float, float] | Exception]:
+    """
+    `calculate_call_metrics` for many calls, with all the sweeps done by one
+    kernel call. A call whose data can't be prepared gets the exception in its
+    slot rather than failing the whole batch.
+    """
+    results: list[Any] = [None] * len(call_dfs)
+    swept: list[tuple[int, _SweepInputs]] = []
+    for index, call_df in enumerate(call_dfs):
+        try:
+            final_metrics, inputs = _sweep_inputs(call_df)
+        except Exception as e:
+            results[index] = e
+            continue
+        if inputs is None:
+            results[index] = final_metrics
+        else:
+            swept.append((index, inputs))
+    if not swept:
+        return results
+
+    lengths = [len(inputs.starts) for _, inputs in swept]
+    offsets = np.zeros(len(swept) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = [np.concatenate([inputs[k] for _, inputs in swept]) for k in range(4)]
+    with _sweep_lines_lock:
+        merged, overlap = _sweep_lines(*flat, offsets)
+    for k, (index, inputs) in enumerate(swept):
+        results[index] = _metrics_from_sweep(
+            float(merged[k]), float(overlap[k]), inputs.total_duration
+        )
+    return results
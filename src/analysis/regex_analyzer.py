@@ -1,121 +1,160 @@
 # analysis/regex_analyzer.py
 import logging
+from collections.abc import Iterable
+from typing import Any
 
+import numpy as np
 import pandas as pd
 
-# Import constants and regex patterns from config
-from config import (
-    AGENT_SPEAKER_ID,
-    BORROWER_SPEAKER_ID,
-    PROFANITY_REGEX,
-    SENSITIVE_REGEX,
-    VERIFY_REGEX,
-)
+# Import constants and regex patterns from config. Every analysis matches
+# keywords with KEYWORD_CATEGORIES, so the single-call and batch paths share
+# one matcher and its word-boundary rules.
+from config import AGENT_SPEAKER_ID, BORROWER_SPEAKER_ID, KEYWORD_CATEGORIES
+from data_loader import sort_call_df
+
+
+def _match_mask(texts: pd.Series | np.ndarray, category: str) -> np.ndarray:
+    """Returns a boolean mask of the texts with a `category` keyword."""
+    return np.fromiter(
+        (
+            isinstance(text, str) and KEYWORD_CATEGORIES.has_category(text, category)
+            for text in texts
+        ),
+        dtype=bool,
+        count=len(texts),
+    )
+
+
+def _joined_text_matches(texts: Iterable[Any], category: str) -> bool:
+    """
+    Searches several utterances for a `category` keyword with a single scan.
+    They are joined with newlines, which the whole-word keywords never span.
+    """
+    joined = "\n".join(text for text in texts if isinstance(text, str))
+    return KEYWORD_CATEGORIES.has_category(joined, category)
+
+
+def _speaker_text_matches(
+    call_df: pd.DataFrame, speaker_id: str, category: str
+) -> bool:
+    """Searches everything one speaker said for a `category` keyword at once."""
+    texts = call_df["text"].to_numpy()[call_df["speaker"].to_numpy() == speaker_id]
+    return _joined_text_matches(texts, category)
 
 
 def detect_profanity_regex(call_df: pd.DataFrame) -> tuple[bool, bool]:
     """Detects profanity using regex for agent and borrower."""
-    agent_profane = False
-    borrower_profane = False
-
     if call_df is None or call_df.empty:
         logging.debug("Regex Profanity: Input DataFrame is empty or None.")
-        return agent_profane, borrower_profane
-
-    for _, row in call_df.iterrows():
-        text = row.get("text")  # Use .get for safety
-        speaker = row.get("speaker")
-
-        if pd.isna(text) or not isinstance(text, str) or pd.isna(speaker):
-            continue  # Skip rows with missing essential data
-
-        if PROFANITY_REGEX.search(text):
-            if speaker == AGENT_SPEAKER_ID:
-                agent_profane = True
-                logging.debug(
-                    f"Regex: Agent profanity detected in text: '{text[:50]}...'"
-                )
-            elif speaker == BORROWER_SPEAKER_ID:
-                borrower_profane = True
-                logging.debug(
-                    f"Regex: Borrower profanity detected in text: '{text[:50]}...'"
-                )
-
-        # Optimization: exit early if both found
-        if agent_profane and borrower_profane:
-            break
+        return False, False
+
+    agent_profane = _speaker_text_matches(call_df, AGENT_SPEAKER_ID, "profanity")
+    borrower_profane = _speaker_text_matches(call_df, BORROWER_SPEAKER_ID, "profanity")
+    if agent_profane or borrower_profane:
+        logging.debug(
+            f"Regex: Profanity detected (agent={agent_profane}, borrower={borrower_profane})."
+        )
 
     return agent_profane, borrower_profane
 
 
+def _agent_borrower_turns(
+    call_df: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the row positions, agent mask and texts of the time-ordered
+    agent/borrower turns with text; only these take part in the verification
+    flow.
+    """
+    call_df = sort_call_df(call_df)
+    speakers = call_df["speaker"].to_numpy()
+    texts = call_df["text"].to_numpy()
+    has_text = np.fromiter(
+        (isinstance(text, str) for text in texts), dtype=bool, count=len(texts)
+    )
+    is_agent = speakers == AGENT_SPEAKER_ID
+    is_turn = (is_agent | (speakers == BORROWER_SPEAKER_ID)) & has_text
+    turn_index = np.flatnonzero(is_turn)
+    return turn_index, is_agent[turn_index], texts[turn_index]
+
+
+def _first_verified_turn(
+    turn_index: np.ndarray, agent_turn: np.ndarray, asked_verification: np.ndarray
+) -> int:
+    # Simple heuristic: Assume any borrower turn right after a verification
+    # question means verification happened.
+    # This is a potential weakness of the regex approach.
+    verified = ~agent_turn[1:] & asked_verification[:-1]
+    first_verified = int(np.argmax(verified)) + 1 if verified.any() else len(turn_index)
+    if first_verified < len(turn_index):
+        logging.debug(
+            f"Regex: Verification assumed at index {turn_index[first_verified]} based on borrower response."
+        )
+    return first_verified
+
+
+def _report_violation(
+    turn_index: np.ndarray, before_verification: np.ndarray, sensitive: np.ndarray
+) -> bool:
+    if sensitive.any():
+        violation_index = turn_index[before_verification[np.argmax(sensitive)]]
+        logging.warning(
+            f"Regex: Potential PRIVACY VIOLATION detected at index {violation_index}. Sensitive info mentioned before verification confirmed."
+        )
+        return True
+    return False
+
+
 def detect_privacy_violation_regex(call_df: pd.DataFrame) -> bool:
     """Detects potential privacy violations using regex (sensitive info before verification)."""
-    is_verified = False
-    agent_asked_verification_in_last_turn = False
-    violation_detected = False
-
     if call_df is None or call_df.empty:
         logging.debug("Regex Privacy: Input DataFrame is empty or None.")
         return False
 
-    # Ensure data is sorted by time
-    call_df = call_df.sort_values(by="stime").reset_index(drop=True)
-
-    for index, row in call_df.iterrows():
-        speaker = row.get("speaker")
-        text = row.get("text")
-
-        if pd.isna(text) or not isinstance(text, str) or pd.isna(speaker):
-            continue
-
-        # Check if borrower responded after agent asked for verification
-        if speaker == BORROWER_SPEAKER_ID and agent_asked_verification_in_last_turn:
-            # Simple heuristic: Assume any response from borrower after verification question means verification happened.
-            # This is a potential weakness of the regex approach.
-            is_verified = True
-            logging.debug(
-                f"Regex: Verification assumed at index {index} based on borrower response."
-            )
-            agent_asked_verification_in_last_turn = (
-                False  # Reset flag after borrower response
-            )
-
-        # Check agent utterances
-        elif speaker == AGENT_SPEAKER_ID:
-            asked_verification_this_turn = False
-            mentioned_sensitive_this_turn = False
-
-            # Did agent ask for verification?
-            if VERIFY_REGEX.search(text):
-                agent_asked_verification_in_last_turn = True
-                asked_verification_this_turn = True
-                logging.debug(
-                    f"Regex: Agent asked verification keywords at index {index}."
-                )
-
-            # Did agent mention sensitive info?
-            if SENSITIVE_REGEX.search(text):
-                mentioned_sensitive_this_turn = True
-                logging.debug(
-                    f"Regex: Agent mentioned sensitive keywords at index {index}."
-                )
-
-            # Check for violation: Sensitive info mentioned *before* verification is confirmed
-            if mentioned_sensitive_this_turn and not is_verified:
-                logging.warning(
-                    f"Regex: Potential PRIVACY VIOLATION detected at index {index}. Sensitive info mentioned before verification confirmed."
-                )
-                violation_detected = True
-                return True  # Violation found, no need to check further
-
-            # Reset verification flag if agent speaks again without asking for verification
-            if not asked_verification_this_turn:
-                agent_asked_verification_in_last_turn = False
-
-        # Reset flag if borrower speaks and didn't just verify
-        elif speaker == BORROWER_SPEAKER_ID:
-            agent_asked_verification_in_last_turn = (
-                False  # Reset flag if borrower speaks
-            )
-
-    return violation_detected  # Return final status after checking all rows
+    turn_index, agent_turn, turn_texts = _agent_borrower_turns(call_df)
+
+    # Did the agent ask for verification in a turn?
+    asked_verification = np.zeros(len(turn_index), dtype=bool)
+    asked_verification[agent_turn] = _match_mask(turn_texts[agent_turn], "verification")
+    first_verified = _first_verified_turn(turn_index, agent_turn, asked_verification)
+
+    # Violation: Sensitive info mentioned by the agent *before* verification is confirmed
+    before_verification = np.flatnonzero(agent_turn[:first_verified])
+    sensitive = _match_mask(turn_texts[before_verification], "sensitive")
+    return _report_violation(turn_index, before_verification, sensitive)
+
+
+def analyze_call_regex(call_df: pd.DataFrame) -> tuple[bool, bool, bool]:
+    """
+    Runs both regex analyses of a call, returning (agent profanity, borrower
+    profanity, privacy violation) as `detect_profanity_regex` and
+    `detect_privacy_violation_regex` would. Each agent turn is scanned once
+    for all three keyword lists instead of once per list.
+    """
+    if call_df is None or call_df.empty:
+        logging.debug("Regex: Input DataFrame is empty or None.")
+        return False, False, False
+
+    turn_index, agent_turn, turn_texts = _agent_borrower_turns(call_df)
+    hits = [KEYWORD_CATEGORIES.categories(text) for text in turn_texts[agent_turn]]
+
+    def agent_mask(category: str) -> np.ndarray:
+        mask = np.zeros(len(turn_index), dtype=bool)
+        mask[agent_turn] = [category in found for found in hits]
+        return mask
+
+    # Borrower turns only need the profanity list, so one joined search does
+    agent_profane = any("profanity" in found for found in hits)
+    borrower_profane = _joined_text_matches(turn_texts[~agent_turn], "profanity")
+    if agent_profane or borrower_profane:
+        logging.debug(
+            f"Regex: Profanity detected (agent={agent_profane}, borrower={borrower_profane})."
+        )
+
+    first_verified = _first_verified_turn(
+        turn_index, agent_turn, agent_mask("verification")
+    )
+    before_verification = np.flatnonzero(agent_turn[:first_verified])
+    sensitive = agent_mask("sensitive")[before_verification]
+    privacy_violation = _report_violation(turn_index, before_verification, sensitive)
+    return agent_profane, borrower_profane, privacy_violation
@@ -1,10 +1,17 @@
+import hashlib
 import os
+import queue
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 st.set_page_config(
     page_title="Call Analysis Tool", layout="wide", initial_sidebar_state="expanded"
@@ -13,8 +20,7 @@ st.set_page_config(
 
 from analysis.llm_analyzer import (
     GENAI_AVAILABLE,
-    detect_privacy_violation_llm,
-    detect_profanity_llm,
+    analyze_all_llm,
     get_genai_client,
 )
 from analysis.metrics_analyzer import calculate_call_metrics
@@ -22,8 +28,8 @@ from analysis.regex_analyzer import (
     detect_privacy_violation_regex,
     detect_profanity_regex,
 )
-from batch_processor import analyze_all_calls
-from config import logging
+from batch_processor import iter_analyze_all_calls
+from config import LLM_MAX_CONCURRENCY, logging
 from data_loader import parse_json_to_df
 
 APP_TITLE = "📞 Debt Collection Call Analysis Tool"
@@ -31,11 +37,165 @@ ANALYSIS_TYPES = ["Profanity Detection", "Privacy and Compliance Violation"]
 APPROACHES_REGEX = "Pattern Matching (Regex)"
 APPROACHES_LLM = "LLM (Google GenAI)"
 APPROACHES = [APPROACHES_REGEX, APPROACHES_LLM]
+PROGRESS_UPDATE_INTERVAL = 0.1  # Seconds between batch progress polls (and redraws)
+# Arrow-backed, so `st.dataframe` can ship the columns without converting them
+SUMMARY_DTYPES = {
+    "Call ID": "string[pyarrow]",
+    "Agent Profanity (Regex)": "bool[pyarrow]",
+    "Borrower Profanity (Regex)": "bool[pyarrow]",
+    "Privacy Violation (Regex)": "bool[pyarrow]",
+    "Agent Profanity (LLM)": "bool[pyarrow]",
+    "Borrower Profanity (LLM)": "bool[pyarrow]",
+    "Privacy Violation (LLM)": "bool[pyarrow]",
+    "LLM Analysis": "category",
+    "Overtalk %": "float[pyarrow]",  # float32
+    "Silence %": "float[pyarrow]",
+    "Duration (s)": "float[pyarrow]",
+    "Errors": "category",
+}
+
+
+# --- Cached Analyzers ---
+# Streamlit reruns the script on every interaction; the deterministic analyzers
+# are cached on a digest of the transcript instead of hashing the DataFrame.
+# LLM answers are already cached (successful responses only) in llm_analyzer.
+ANALYSIS_CACHE_TTL = 24 * 60 * 60  # Seconds
+
+
+def _transcript_key(call_df: pd.DataFrame) -> str:
+    """Returns a digest identifying the transcript rows the analyzers read."""
+    row_hashes = pd.util.hash_pandas_object(
+        call_df[["speaker", "text", "stime", "etime"]], index=False
+    )
+    return hashlib.blake2b(row_hashes.to_numpy().tobytes()).hexdigest()
+
+
+@st.cache_data(show_spinner=False, ttl=ANALYSIS_CACHE_TTL)
+def _cached_profanity_regex(transcript_key: str, _call_df: pd.DataFrame):
+    return detect_profanity_regex(_call_df)
+
+
+@st.cache_data(show_spinner=False, ttl=ANALYSIS_CACHE_TTL)
+def _cached_privacy_violation_regex(transcript_key: str, _call_df: pd.DataFrame):
+    return detect_privacy_violation_regex(_call_df)
+
+
+@st.cache_data(show_spinner=False, ttl=ANALYSIS_CACHE_TTL)
+def _cached_call_metrics(transcript_key: str, _call_df: pd.DataFrame):
+    return calculate_call_metrics(_call_df)
+
+
+@st.cache_data(show_spinner=False)
+def _parse_uploaded_json(file_bytes: bytes) -> pd.DataFrame | None:
+    """Parses an uploaded transcript once per distinct file content."""
+    return parse_json_to_df(file_bytes)
+
+
+def _directory_signature(directory: str) -> tuple:
+    """(name, mtime, size) of every JSON file, so edits invalidate cached batches."""
+    with os.scandir(directory) as entries:
+        return tuple(
+            sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries
+                if entry.name.endswith(".json")
+            )
+        )
+
+
+@st.cache_resource
+def _batch_results_cache() -> dict[str, tuple[tuple, dict[str, dict[str, Any]]]]:
+    """
+    Last batch results per directory, shared across reruns and sessions. Kept by
+    hand rather than with `st.cache_data`, which would record (and later replay)
+    the progress bar updates made during the run.
+    """
+    return {}
+
+
+def _analyze_directory_cached(
+    directory: str, max_concurrency: int, progress_callback=None
+) -> dict[str, dict[str, Any]]:
+    """
+    `analyze_all_calls`, memoized on the directory contents and the LLM status.
+    Runs that hit LLM errors are not cached, so they are retried next time.
+
+    The analysis runs in a background thread while this (script) thread polls
+    it every PROGRESS_UPDATE_INTERVAL, so a widget change or Stop interrupts
+    the wait promptly; the run itself then stops at its next finished call.
+    `progress_callback` gets the latest progress at each poll.
+    """
+    cache = _batch_results_cache()
+    cache_key = (
+        _directory_signature(directory),
+        llm_ready(),
+        max_concurrency,
+    )
+    cached = cache.get(directory)
+    if cached is not None and cached[0] == cache_key:
+        logging.info(f"Using cached batch results for {directory}.")
+        return cached[1]
+
+    results = {}
+    progress = queue.Queue()  # (completed, total, call_id) from the worker
+    cancelled = threading.Event()
+    error = []
+
+    def run_batch():
+        try:
+            with closing(
+                iter_analyze_all_calls(directory, max_concurrency=max_concurrency)
+            ) as analyses:
+                for completed, total, call_id, call_results in analyses:
+                    results[call_id] = call_results
+                    progress.put((completed, total, call_id))
+                    if cancelled.is_set():
+                        logging.info(f"Batch analysis of {directory} cancelled.")
+                        return
+        except Exception as e:
+            error.append(e)
+
+    # The worker does reach Streamlit: `get_genai_client` is an
+    # `st.cache_resource`, and the LLM analyzers report problems with
+    # `st.warning`/`st.error` and `st.session_state`. Without this script run's
+    # context those calls log "missing ScriptRunContext" and show nothing. The
+    # progress bar itself is only updated here, from the data on the queue.
+    # (The regex/metrics pass runs in an executor thread without the context,
+    # which is fine: it makes no Streamlit call.)
+    worker = threading.Thread(target=run_batch, name="batch-analysis", daemon=True)
+    add_script_run_ctx(worker, get_script_run_ctx())
+    worker.start()
+    try:
+        while True:
+            worker.join(PROGRESS_UPDATE_INTERVAL)
+            latest = None
+            while not progress.empty():
+                latest = progress.get_nowait()
+            if progress_callback and latest is not None:
+                completed, total, call_id = latest
+                progress_callback(completed, total, f"{call_id}.json")
+            if not worker.is_alive():
+                break
+    finally:
+        # Also reached when a rerun interrupts the script thread
+        cancelled.set()
+    if error:
+        raise error[0]
+    if not any("llm_error" in r for r in results.values()):
+        cache[directory] = (cache_key, results)
+    return results
 
 
 # --- Helper Functions for UI ---
 
 
+def llm_ready() -> bool:
+    """Whether LLM analysis can run; the client is probed once per session."""
+    if "llm_ready" not in st.session_state:
+        st.session_state["llm_ready"] = bool(GENAI_AVAILABLE and get_genai_client())
+    return st.session_state["llm_ready"]
+
+
 def display_analysis_result(
     entity_option: str, approach_option: str, call_df: pd.DataFrame
 ):
@@ -48,7 +208,7 @@ def display_analysis_result(
         # Regex Logic
         if approach_option == APPROACHES_REGEX:
             if entity_option == ANALYSIS_TYPES[0]:  # Profanity
-                a_f, b_f = detect_profanity_regex(call_df)
+                a_f, b_f = _cached_profanity_regex(_transcript_key(call_df), call_df)
                 col1, col2 = st.columns(2)
                 col1.metric("Agent Profanity", "Yes" if a_f else "No")
                 col2.metric("Borrower Profanity", "Yes" if b_f else "No")
@@ -58,7 +218,7 @@ def display_analysis_result(
                     st.info("Borrower profanity detected (Regex).", icon="🗣️")
                 analysis_performed = True
             elif entity_option == ANALYSIS_TYPES[1]:  # Privacy
-                v_f = detect_privacy_violation_regex(call_df)
+                v_f = _cached_privacy_violation_regex(_transcript_key(call_df), call_df)
                 st.metric("Potential Privacy Violation", "Yes" if v_f else "No")
                 if v_f:
                     st.error("Potential violation detected (Regex).", icon="🔒")
@@ -73,13 +233,16 @@ def display_analysis_result(
                     "LLM analysis unavailable: `google-generai` library not installed."
                 )
                 st.error(error_message, icon="🚨")
-            elif get_genai_client() is None:  # Check if client is ready
+            elif not llm_ready():  # Check if client is ready
                 error_message = "LLM analysis unavailable: Google GenAI Client connection failed. Check API Key/Network."
                 st.error(error_message, icon="❌")
             else:
                 with st.spinner("Analyzing with LLM..."):
+                    # One request answers both entities
+                    llm_results = analyze_all_llm(call_df)
                     if entity_option == ANALYSIS_TYPES[0]:  # Profanity
-                        a_f, b_f = detect_profanity_llm(call_df)
+                        a_f = llm_results["agent_profanity_llm"]
+                        b_f = llm_results["borrower_profanity_llm"]
                         col1, col2 = st.columns(2)
                         col1.metric("Agent Profanity (LLM)", "Yes" if a_f else "No")
                         col2.metric("Borrower Profanity (LLM)", "Yes" if b_f else "No")
@@ -89,7 +252,7 @@ def display_analysis_result(
                             st.info("LLM detected Borrower profanity.", icon="🗣️")
                         analysis_performed = True
                     elif entity_option == ANALYSIS_TYPES[1]:  # Privacy
-                        v_f = detect_privacy_violation_llm(call_df)
+                        v_f = llm_results["privacy_violation_llm"]
                         st.metric(
                             "Potential Privacy Violation (LLM)", "Yes" if v_f else "No"
                         )
@@ -120,7 +283,9 @@ def display_metrics(call_df: pd.DataFrame):
     """Calculates and displays call quality metrics and visualization."""
     st.subheader("📊 Call Quality Metrics")
     try:
-        ot_pct, sil_pct, tot_dur = calculate_call_metrics(call_df)
+        ot_pct, sil_pct, tot_dur = _cached_call_metrics(
+            _transcript_key(call_df), call_df
+        )
 
         c1, c2, c3 = st.columns(3)
         c1.metric("Overtalk %", f"{ot_pct:.2f}%")
@@ -172,6 +337,60 @@ def display_metrics(call_df: pd.DataFrame):
         st.error(f"Could not calculate/display metrics: {e}", icon="⚠️")
 
 
+def display_call(
+    file_name: str, call_df: pd.DataFrame, entity_option: str, approach_option: str
+):
+    """Displays the selected analysis and the metrics of one parsed call."""
+    st.success(f"Successfully parsed '{file_name}' ({len(call_df)} utterances).")
+    with st.expander("View Raw Data"):
+        st.dataframe(call_df, height=300)
+
+    # Containers for results
+    res_c = st.container(border=True)
+    met_c = st.container(border=True)
+
+    with res_c:
+        display_analysis_result(entity_option, approach_option, call_df)
+    with met_c:
+        display_metrics(call_df)
+
+
+def prefetch_call_analysis(
+    entity_option: str, approach_option: str, call_df: pd.DataFrame
+) -> None:
+    """
+    Runs the selected analysis ahead of rendering (e.g. in a worker thread), so
+    that `display_call` then reads the results from the analyzer caches.
+    """
+    transcript_key = _transcript_key(call_df)
+    _cached_call_metrics(transcript_key, call_df)
+    if approach_option == APPROACHES_REGEX:
+        if entity_option == ANALYSIS_TYPES[0]:  # Profanity
+            _cached_profanity_regex(transcript_key, call_df)
+        elif entity_option == ANALYSIS_TYPES[1]:  # Privacy
+            _cached_privacy_violation_regex(transcript_key, call_df)
+    elif approach_option == APPROACHES_LLM and llm_ready():
+        # Both LLM checks share a single (cached) Gemini request
+        analyze_all_llm(call_df)
+
+
+def binned_histogram(values: pd.Series, title: str, bins: int):
+    """
+    Histogram of `values`, binned here rather than by Plotly in the browser, so
+    the chart payload holds `bins` bars instead of every call's value.
+    """
+    counts, edges = np.histogram(values.to_numpy(dtype=np.float64), bins=bins)
+    fig = px.bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        title=title,
+        labels={"x": values.name, "y": "count"},
+    )
+    fig.update_traces(width=np.diff(edges))
+    fig.update_layout(bargap=0)
+    return fig
+
+
 def display_batch_results_summary(results: dict[str, dict[str, Any]]):
     """Displays the summary table and visualizations for batch results."""
     if not results:
@@ -194,15 +413,15 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
     valid_metric_calls = 0
     for call_id, res in results.items():
         row = {"Call ID": call_id}
-        # Regex Results
-        row["Agent Profanity (Regex)"] = res.get("agent_profanity_regex", "Error")
-        row["Borrower Profanity (Regex)"] = res.get("borrower_profanity_regex", "Error")
-        row["Privacy Violation (Regex)"] = res.get("privacy_violation_regex", "Error")
+        # Regex Results (missing ones show as <NA>; the Errors column says why)
+        row["Agent Profanity (Regex)"] = res.get("agent_profanity_regex")
+        row["Borrower Profanity (Regex)"] = res.get("borrower_profanity_regex")
+        row["Privacy Violation (Regex)"] = res.get("privacy_violation_regex")
         # LLM Results
         if has_llm_results and not llm_skipped_all:
-            row["Agent Profanity (LLM)"] = res.get("agent_profanity_llm", "N/A")
-            row["Borrower Profanity (LLM)"] = res.get("borrower_profanity_llm", "N/A")
-            row["Privacy Violation (LLM)"] = res.get("privacy_violation_llm", "N/A")
+            row["Agent Profanity (LLM)"] = res.get("agent_profanity_llm")
+            row["Borrower Profanity (LLM)"] = res.get("borrower_profanity_llm")
+            row["Privacy Violation (LLM)"] = res.get("privacy_violation_llm")
         elif llm_skipped_all:
             row["LLM Analysis"] = "Skipped (Check Config/Key)"
         # Metrics
@@ -215,11 +434,8 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
         if "regex_error" in res:
             error_counts["Regex Error"] += 1
             has_error = True
-        if "llm_profanity_error" in res:
-            error_counts["LLM Profanity Error"] += 1
-            has_error = True
-        if "llm_privacy_error" in res:
-            error_counts["LLM Privacy Error"] += 1
+        if "llm_error" in res:
+            error_counts["LLM Error"] += 1
             has_error = True
         if "metrics_error" in res:
             error_counts["Metrics Error"] += 1
@@ -231,7 +447,12 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
 
         summary_data.append(row)
 
+    # Typed columns instead of object ones: nullable booleans for the flags,
+    # float32 metrics and categorical labels (see SUMMARY_DTYPES)
     summary_df = pd.DataFrame(summary_data)
+    summary_df = summary_df.astype({
+        col: SUMMARY_DTYPES[col] for col in summary_df.columns if col in SUMMARY_DTYPES
+    })
 
     # --- Display Summary Table ---
     st.dataframe(summary_df, use_container_width=True)
@@ -239,20 +460,25 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
     # --- Display Aggregate Counts ---
     st.markdown("**Aggregate Findings:**")
     cols = st.columns(3 if not llm_skipped_all else 2)
+    # One pass over the flag columns; sums skip <NA> and count the Trues
+    flag_columns = [
+        col for col in summary_df.columns if SUMMARY_DTYPES.get(col) == "bool[pyarrow]"
+    ]
+    flag_counts = summary_df[flag_columns].sum()
 
     with cols[0]:
         st.markdown("**Regex**")
         st.metric(
             "Agent Profanity",
-            summary_df[summary_df["Agent Profanity (Regex)"] == True].shape[0],
+            int(flag_counts["Agent Profanity (Regex)"]),
         )
         st.metric(
             "Borrower Profanity",
-            summary_df[summary_df["Borrower Profanity (Regex)"] == True].shape[0],
+            int(flag_counts["Borrower Profanity (Regex)"]),
         )
         st.metric(
             "Privacy Violations",
-            summary_df[summary_df["Privacy Violation (Regex)"] == True].shape[0],
+            int(flag_counts["Privacy Violation (Regex)"]),
         )
 
     if not llm_skipped_all:
@@ -261,15 +487,15 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
             if has_llm_results:
                 st.metric(
                     "Agent Profanity",
-                    summary_df[summary_df["Agent Profanity (LLM)"] == True].shape[0],
+                    int(flag_counts["Agent Profanity (LLM)"]),
                 )
                 st.metric(
                     "Borrower Profanity",
-                    summary_df[summary_df["Borrower Profanity (LLM)"] == True].shape[0],
+                    int(flag_counts["Borrower Profanity (LLM)"]),
                 )
                 st.metric(
                     "Privacy Violations",
-                    summary_df[summary_df["Privacy Violation (LLM)"] == True].shape[0],
+                    int(flag_counts["Privacy Violation (LLM)"]),
                 )
             else:
                 st.caption("LLM results unavailable or failed.")
@@ -278,40 +504,28 @@ def display_batch_results_summary(results: dict[str, dict[str, Any]]):
     with cols[metric_col_index]:
         st.markdown("**Average Metrics**")
         if valid_metric_calls > 0:
-            # Calculate means only on valid numeric rows
-            valid_metrics = summary_df[
-                pd.to_numeric(summary_df["Overtalk %"], errors="coerce").notna()
-            ]
-            st.metric("Avg. Overtalk %", f"{valid_metrics['Overtalk %'].mean():.2f}%")
-            st.metric("Avg. Silence %", f"{valid_metrics['Silence %'].mean():.2f}%")
-            st.metric(
-                "Avg. Duration (s)", f"{valid_metrics['Duration (s)'].mean():.2f}s"
-            )
+            # Means skip the <NA> of calls without metrics
+            st.metric("Avg. Overtalk %", f"{summary_df['Overtalk %'].mean():.2f}%")
+            st.metric("Avg. Silence %", f"{summary_df['Silence %'].mean():.2f}%")
+            st.metric("Avg. Duration (s)", f"{summary_df['Duration (s)'].mean():.2f}s")
             st.caption(f"Based on {valid_metric_calls} calls with valid metrics.")
         else:
             st.caption("No valid metrics found.")
 
     # --- Display Metric Distributions ---
     st.markdown("**Metric Distributions (for calls with valid metrics):**")
-    metrics_df = summary_df.dropna(
-        subset=["Overtalk %", "Silence %", "Duration (s)"]
-    ).copy()
-    metrics_df = metrics_df[
-        pd.to_numeric(metrics_df["Overtalk %"], errors="coerce").notna()
-    ]  # Ensure numeric
-    metrics_df["Overtalk %"] = metrics_df["Overtalk %"].astype(float)
-    metrics_df["Silence %"] = metrics_df["Silence %"].astype(float)
+    metrics_df = summary_df.dropna(subset=["Overtalk %", "Silence %", "Duration (s)"])
 
     if not metrics_df.empty:
         col1, col2 = st.columns(2)
         with col1:
-            fig_ot = px.histogram(
-                metrics_df, x="Overtalk %", title="Overtalk % Distribution", nbins=15
+            fig_ot = binned_histogram(
+                metrics_df["Overtalk %"], title="Overtalk % Distribution", bins=15
             )
             st.plotly_chart(fig_ot, use_container_width=True)
         with col2:
-            fig_sil = px.histogram(
-                metrics_df, x="Silence %", title="Silence % Distribution", nbins=15
+            fig_sil = binned_histogram(
+                metrics_df["Silence %"], title="Silence % Distribution", bins=15
             )
             st.plotly_chart(fig_sil, use_container_width=True)
     else:
@@ -356,7 +570,7 @@ def run_streamlit_app():
     if not GENAI_AVAILABLE:
         llm_status_msg = "LLM features unavailable: `google-genai` not installed."
         llm_status_icon = "⚠️"
-    elif get_genai_client() is None:
+    elif not llm_ready():
         llm_status_msg = "LLM client connection failed. Check API Key/Network."
         llm_status_icon = "❌"
     else:
@@ -373,16 +587,17 @@ def run_streamlit_app():
     # --- Single File Mode ---
     if analysis_mode == "Analyze Single File":
         st.sidebar.header("Single File Analysis")
-        uploaded_file = st.sidebar.file_uploader(
-            "Upload call transcript (JSON)", type=["json"], key="single_uploader"
+        uploaded_files = st.sidebar.file_uploader(
+            "Upload call transcript(s) (JSON)",
+            type=["json"],
+            accept_multiple_files=True,
+            key="single_uploader",
         )
         entity_option = st.sidebar.selectbox(
             "Analysis Type", ANALYSIS_TYPES, key="entity_single"
         )
         # Filter approaches based on LLM availability
-        available_approaches = (
-            APPROACHES if GENAI_AVAILABLE and get_genai_client() else [APPROACHES_REGEX]
-        )
+        available_approaches = APPROACHES if llm_ready() else [APPROACHES_REGEX]
         approach_option = st.sidebar.selectbox(
             "Approach",
             available_approaches,
@@ -399,46 +614,68 @@ def run_streamlit_app():
 
         st.header("Single File Analysis Results")
 
-        if analyze_button and uploaded_file is not None:
-            uploaded_file.seek(0)  # Reset file pointer before reading again
-            call_df = None
-            parse_error = False
-            try:
-                # Pass the file object directly to the parser
-                call_df = parse_json_to_df(uploaded_file)
-            except Exception as e:
-                st.error(f"Fatal error parsing file: {e}")
-                logging.error(f"File parsing failed in UI: {e}", exc_info=True)
-                parse_error = True
-
-            if call_df is not None and not call_df.empty:
-                st.success(
-                    f"Successfully parsed '{uploaded_file.name}' ({len(call_df)} utterances)."
-                )
-                with st.expander("View Raw Data"):
-                    st.dataframe(call_df, height=300)
-
-                # Containers for results
-                res_c = st.container(border=True)
-                met_c = st.container(border=True)
-
-                with res_c:
-                    display_analysis_result(entity_option, approach_option, call_df)
-                with met_c:
-                    display_metrics(call_df)
+        if analyze_button and uploaded_files:
+            parsed_calls = []
+            for uploaded_file in uploaded_files:
+                call_df = None
+                parse_error = False
+                try:
+                    # Parsed frames are cached on the file content across reruns
+                    call_df = _parse_uploaded_json(uploaded_file.getvalue())
+                except Exception as e:
+                    st.error(f"Fatal error parsing file: {e}")
+                    logging.error(f"File parsing failed in UI: {e}", exc_info=True)
+                    parse_error = True
+
+                if call_df is not None and not call_df.empty:
+                    parsed_calls.append((uploaded_file.name, call_df))
+                elif (
+                    not parse_error
+                ):  # If parsing didn't throw error but returned None/empty
+                    st.error(
+                        f"Could not parse or process the data in '{uploaded_file.name}'. Check file format and content (see logs for details)."
+                    )
 
-            elif (
-                not parse_error
-            ):  # If parsing didn't throw error but returned None/empty
-                st.error(
-                    f"Could not parse or process the data in '{uploaded_file.name}'. Check file format and content (see logs for details)."
-                )
+            if len(parsed_calls) == 1:
+                display_call(*parsed_calls[0], entity_option, approach_option)
+            elif parsed_calls:
+                # Analyze the calls concurrently (the LLM requests are I/O bound)
+                # and render each one from the warmed caches as soon as it is done.
+                # The pool threads call the `st.cache_data` analyzers and may
+                # show LLM warnings, so they get this script run's context
+                ctx = get_script_run_ctx()
+                with ThreadPoolExecutor(
+                    max_workers=min(LLM_MAX_CONCURRENCY, len(parsed_calls)),
+                    initializer=lambda: add_script_run_ctx(
+                        threading.current_thread(), ctx
+                    ),
+                ) as executor:
+                    futures = {
+                        executor.submit(
+                            prefetch_call_analysis,
+                            entity_option,
+                            approach_option,
+                            call_df,
+                        ): (file_name, call_df)
+                        for file_name, call_df in parsed_calls
+                    }
+                    for future in as_completed(futures):
+                        file_name, call_df = futures[future]
+                        if future.exception():
+                            # The display functions re-run and report the error
+                            logging.warning(
+                                f"Background analysis of {file_name} failed: {future.exception()}"
+                            )
+                        with st.status(file_name, state="complete"):
+                            display_call(
+                                file_name, call_df, entity_option, approach_option
+                            )
 
-        elif analyze_button and uploaded_file is None:
+        elif analyze_button:
             st.warning("Please upload a JSON file first.", icon="⬆️")
         else:
             st.info(
-                "Upload a file and select options in the sidebar, then click 'Analyze Call'."
+                "Upload one or more files and select options in the sidebar, then click 'Analyze Call'."
             )
 
     # --- Batch Mode ---
@@ -450,6 +687,14 @@ def run_streamlit_app():
             key="batch_dir_input",
             help="Enter the relative or absolute path to the directory.",
         )
+        max_concurrency = st.sidebar.number_input(
+            "Max concurrent LLM requests",
+            min_value=1,
+            max_value=64,
+            value=LLM_MAX_CONCURRENCY,
+            key="batch_max_concurrency",
+            help="Requests sent to the LLM in parallel. Lower it if you hit rate limits.",
+        )
 
         batch_btn = st.sidebar.button(
             "🚀 Run Batch Analysis",
@@ -476,8 +721,11 @@ def run_streamlit_app():
                 results = None
                 try:
                     # Pass the UI callback function to the batch processor
-                    results = analyze_all_calls(
-                        data_dir, progress_callback=update_progress
+                    # Re-running on an unchanged directory is served from cache
+                    results = _analyze_directory_cached(
+                        data_dir,
+                        max_concurrency,
+                        progress_callback=update_progress,
                     )
                     st.session_state["batch_results"] = results  # Store results
                     progress_bar.empty()  # Hide progress bar on completion
@@ -1,53 +1,247 @@
 # batch_processor.py
+import asyncio
 import logging
-from collections import defaultdict
-from collections.abc import Callable
+import multiprocessing
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
+import pandas as pd
+
 from analysis.llm_analyzer import (
     GENAI_AVAILABLE,
-    detect_privacy_violation_llm,
-    detect_profanity_llm,
+    analyze_calls_llm,
+    async_session,
     get_genai_client,  # To check if LLM is available
 )
-from analysis.metrics_analyzer import calculate_call_metrics
-from analysis.regex_analyzer import (
-    detect_privacy_violation_regex,
-    detect_profanity_regex,
+from analysis.metrics_analyzer import (
+    calculate_call_metrics_batch,
+    set_kernel_threads,
+)
+from analysis.regex_analyzer import analyze_call_regex
+from config import (
+    BATCH_CHUNK_SIZE,
+    BATCH_MAX_WORKERS,
+    BATCH_PARALLEL_MIN_CALLS,
+    LLM_MAX_CONCURRENCY,
 )
 
 # Import necessary components
 from data_loader import load_all_calls
 
 
-def analyze_all_calls(
-    directory: str, progress_callback: Callable[[int, int, str], None] | None = None
-) -> dict[str, dict[str, Any]]:
+def _report_progress(
+    progress_callback: Callable[[int, int, str], None] | None,
+    current: int,
+    total: int,
+    call_id: str,
+) -> None:
+    """Reports progress to the UI callback, never letting it break the batch."""
+    if progress_callback:
+        try:
+            # Use filename = call_id + ".json" for consistency if needed
+            progress_callback(current, total, f"{call_id}.json")
+        except Exception as cb_e:
+            logging.warning(f"Progress callback failed during analysis loop: {cb_e}")
+
+
+def _analyze_calls_local(
+    calls: list[tuple[str, pd.DataFrame]],
+) -> list[tuple[str, dict[str, Any]]]:
     """
-    Analyzes all valid call transcripts in a directory using all available methods.
+    Runs the regex and metrics analyses of a chunk of calls; the metrics of the
+    whole chunk come from one (parallel) kernel call. Module-level (picklable)
+    so that it can run in a worker process.
+    """
+    chunk_results = []
+    for call_id, df in calls:
+        logging.info(f"Analyzing call: {call_id}")
+        current_results = {}
+
+        # --- Run Regex Analysis ---
+        try:
+            agent_pr_re, borrower_pr_re, privacy_vr_re = analyze_call_regex(df)
+            current_results.update({
+                "agent_profanity_regex": agent_pr_re,
+                "borrower_profanity_regex": borrower_pr_re,
+                "privacy_violation_regex": privacy_vr_re,
+            })
+        except Exception as e:
+            logging.error(
+                f"Batch: Regex analysis error on {call_id}: {e}", exc_info=True
+            )
+            current_results["regex_error"] = str(e)
+        chunk_results.append((call_id, current_results))
+
+    # --- Run Metrics Calculation ---
+    metrics = calculate_call_metrics_batch([df for _, df in calls])
+    for (call_id, current_results), call_metrics in zip(chunk_results, metrics):
+        if isinstance(call_metrics, Exception):
+            logging.error(
+                f"Batch: Metrics calculation error on {call_id}: {call_metrics}",
+                exc_info=call_metrics,
+            )
+            current_results["metrics_error"] = str(call_metrics)
+            # Set metrics to None or NaN to indicate failure
+            call_metrics = (None, None, None)
+        overtalk, silence, duration = call_metrics
+        current_results.update({
+            "overtalk_percentage": overtalk,
+            "silence_percentage": silence,
+            "total_duration_seconds": duration,
+        })
+
+    return chunk_results
+
+
+def _iter_local_analyses(
+    all_call_data: dict[str, pd.DataFrame],
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Yields (call_id, results) of the regex and metrics analyses, in input order.
+    Calls are analyzed in chunks; large batches are spread over worker
+    processes (the work is CPU bound).
+    """
+    total_calls = len(all_call_data)
+    calls = list(all_call_data.items())
+    if total_calls < BATCH_PARALLEL_MIN_CALLS or BATCH_MAX_WORKERS <= 1:
+        for i in range(0, total_calls, BATCH_CHUNK_SIZE):
+            yield from _analyze_calls_local(calls[i : i + BATCH_CHUNK_SIZE])
+        return
+
+    logging.info(f"Analyzing calls in {BATCH_MAX_WORKERS} worker processes...")
+    chunk_size = min(BATCH_CHUNK_SIZE, max(1, total_calls // (BATCH_MAX_WORKERS * 4)))
+    # "spawn": forking the multi-threaded Streamlit server is not safe. Each
+    # worker already owns a core, so its metrics kernel stays single-threaded
+    with ProcessPoolExecutor(
+        max_workers=BATCH_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=set_kernel_threads,
+        initargs=(1,),
+    ) as executor:
+        for chunk_results in executor.map(
+            _analyze_calls_local,
+            [calls[i : i + chunk_size] for i in range(0, total_calls, chunk_size)],
+        ):
+            yield from chunk_results
+
+
+def _llm_error_results(error: Exception) -> dict[str, Any]:
+    return {
+        "llm_error": str(error),
+        # Set flags to None to indicate failure for this call
+        "agent_profanity_llm": None,
+        "borrower_profanity_llm": None,
+        "privacy_violation_llm": None,
+    }
+
+
+async def _analyze_calls_overlapped(
+    all_call_data: dict[str, pd.DataFrame],
+    max_concurrency: int,
+    on_local_result: Callable[[str, dict[str, Any]], None],
+    on_llm_result: Callable[[str, dict[str, Any]], None],
+) -> list[Any]:
+    """
+    Runs the regex/metrics pass in a worker thread while the LLM requests are
+    in flight, handing each result to the matching callback (`on_local_result`
+    is called from the worker thread). Returns [None, llm_results], where
+    either item may instead be the exception that its pass raised.
+    """
+    loop = asyncio.get_running_loop()
+
+    def _local_pass() -> None:
+        for call_id, current_results in _iter_local_analyses(all_call_data):
+            on_local_result(call_id, current_results)
+
+    local_pass = loop.run_in_executor(None, _local_pass)
+    llm_pass = analyze_calls_llm(
+        all_call_data, max_concurrency=max_concurrency, on_result=on_llm_result
+    )
+    return await asyncio.gather(local_pass, llm_pass, return_exceptions=True)
+
+
+def _iter_analyses_with_llm(
+    all_call_data: dict[str, pd.DataFrame], max_concurrency: int
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Yields (call_id, results) as soon as both the regex/metrics and the LLM
+    results of a call are in. The event loop only runs while this generator
+    waits for the next result, so it stays on the caller's thread.
+    """
+    with async_session() as runner:
+        loop = runner.get_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def _on_local_result(call_id: str, current_results: dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(
+                events.put_nowait, ("local", call_id, current_results)
+            )
+
+        def _on_llm_result(call_id: str, llm_result: dict[str, Any]) -> None:
+            events.put_nowait(("llm", call_id, llm_result))
+
+        passes = loop.create_task(
+            _analyze_calls_overlapped(
+                all_call_data, max_concurrency, _on_local_result, _on_llm_result
+            )
+        )
+        passes.add_done_callback(lambda _: events.put_nowait(("done", None, None)))
+
+        # Halves of a call that arrived before their counterpart
+        pending: dict[str, dict[str, dict[str, Any]]] = {"local": {}, "llm": {}}
+        while True:
+            kind, call_id, result = runner.run(events.get())
+            if kind == "done":
+                break
+            other_kind = "llm" if kind == "local" else "local"
+            if call_id not in pending[other_kind]:
+                pending[kind][call_id] = result
+                continue
+            other = pending[other_kind].pop(call_id)
+            local_result, llm_result = (
+                (result, other) if kind == "local" else (other, result)
+            )
+            local_result.update(llm_result)
+            yield call_id, local_result
+
+        local_error, llm_results = passes.result()
+        if isinstance(local_error, BaseException):
+            raise local_error
+        if isinstance(llm_results, Exception):
+            logging.error(
+                f"Batch: LLM analysis error: {llm_results}", exc_info=llm_results
+            )
+            llm_results = {
+                call_id: _llm_error_results(llm_results) for call_id in all_call_data
+            }
+        for call_id, local_result in pending["local"].items():
+            local_result.update(llm_results.get(call_id, {}))
+            yield call_id, local_result
+
+
+def iter_analyze_all_calls(
+    directory: str, max_concurrency: int = LLM_MAX_CONCURRENCY
+) -> Iterator[tuple[int, int, str, dict[str, Any]]]:
+    """
+    Analyzes all valid call transcripts in a directory using all available
+    methods, yielding each call's results as soon as they are complete.
 
     Args:
         directory: Path to the directory containing JSON call files.
-        progress_callback: Optional function to report progress back to the UI.
-                           Should accept (current_count, total_count, filename).
+        max_concurrency: Maximum number of LLM requests in flight at the same time.
 
-    Returns:
-        A dictionary where keys are call_ids and values are dictionaries
-        containing analysis results for that call.
+    Yields:
+        (completed_count, total_count, call_id, results) tuples, so the caller
+        can decide how often to report progress.
     """
-    results = defaultdict(dict)
     logging.info(f"Starting batch analysis for directory: {directory}")
-
-    # Load calls, passing the progress callback directly if loader supports it
-    # If load_all_calls doesn't accept callback, we handle progress in the loop below
-    all_call_data = load_all_calls(
-        directory
-    )  # Add callback here if loader is modified: , progress_callback=progress_callback
+    all_call_data = load_all_calls(directory)
 
     if not all_call_data:
         logging.warning("Batch Analysis: No valid call data loaded.")
         # UI feedback handled by caller (app.py)
-        return dict(results)
+        return
 
     # Check LLM availability *once* before the loop
     llm_available_and_ready = GENAI_AVAILABLE and (get_genai_client() is not None)
@@ -60,92 +254,55 @@ def analyze_all_calls(
     total_calls = len(all_call_data)
     logging.info(f"Analyzing {total_calls} loaded calls...")
 
-    for i, (call_id, df) in enumerate(all_call_data.items()):
-        logging.info(f"Analyzing call: {call_id} ({i + 1}/{total_calls})")
-        current_results = {}
-
-        # --- Run Regex Analysis ---
-        try:
-            agent_pr_re, borrower_pr_re = detect_profanity_regex(df)
-            privacy_vr_re = detect_privacy_violation_regex(df)
-            current_results.update({
-                "agent_profanity_regex": agent_pr_re,
-                "borrower_profanity_regex": borrower_pr_re,
-                "privacy_violation_regex": privacy_vr_re,
-            })
-        except Exception as e:
-            logging.error(
-                f"Batch: Regex analysis error on {call_id}: {e}", exc_info=True
+    if not llm_available_and_ready:
+        analyses = (
+            # Mark LLM results as explicitly unavailable if LLM wasn't ready
+            (
+                call_id,
+                current_results
+                | {
+                    "agent_profanity_llm": None,
+                    "borrower_profanity_llm": None,
+                    "privacy_violation_llm": None,
+                    "llm_skipped": True,  # Add a flag indicating LLM was skipped
+                },
             )
-            current_results["regex_error"] = str(e)
+            for call_id, current_results in _iter_local_analyses(all_call_data)
+        )
+    # --- Run LLM Analysis (if available and ready) ---
+    # Calls are fanned out concurrently, overlapping with the regex/metrics pass
+    else:
+        analyses = _iter_analyses_with_llm(all_call_data, max_concurrency)
 
-        # --- Run LLM Analysis (if available and ready) ---
-        if llm_available_and_ready:
-            try:
-                agent_pr_llm, borrower_pr_llm = detect_profanity_llm(df)
-                current_results.update({
-                    "agent_profanity_llm": agent_pr_llm,
-                    "borrower_profanity_llm": borrower_pr_llm,
-                })
-            except Exception as e:
-                logging.error(
-                    f"Batch: LLM profanity error on {call_id}: {e}", exc_info=True
-                )
-                current_results["llm_profanity_error"] = str(e)
-                # Set flags to None to indicate failure for this call
-                current_results["agent_profanity_llm"] = None
-                current_results["borrower_profanity_llm"] = None
-
-            try:
-                privacy_vr_llm = detect_privacy_violation_llm(df)
-                current_results["privacy_violation_llm"] = privacy_vr_llm
-            except Exception as e:
-                logging.error(
-                    f"Batch: LLM privacy error on {call_id}: {e}", exc_info=True
-                )
-                current_results["llm_privacy_error"] = str(e)
-                # Set flag to None to indicate failure for this call
-                current_results["privacy_violation_llm"] = None
-        else:
-            # Mark LLM results as explicitly unavailable if LLM wasn't ready
-            current_results.update({
-                "agent_profanity_llm": None,
-                "borrower_profanity_llm": None,
-                "privacy_violation_llm": None,
-                "llm_skipped": True,  # Add a flag indicating LLM was skipped
-            })
+    completed = 0
+    for completed, (call_id, current_results) in enumerate(analyses, start=1):
+        yield completed, total_calls, call_id, current_results
 
-        # --- Run Metrics Calculation ---
-        try:
-            overtalk, silence, duration = calculate_call_metrics(df)
-            current_results.update({
-                "overtalk_percentage": overtalk,
-                "silence_percentage": silence,
-                "total_duration_seconds": duration,
-            })
-        except Exception as e:
-            logging.error(
-                f"Batch: Metrics calculation error on {call_id}: {e}", exc_info=True
-            )
-            current_results["metrics_error"] = str(e)
-            # Set metrics to None or NaN to indicate failure
-            current_results.update({
-                "overtalk_percentage": None,
-                "silence_percentage": None,
-                "total_duration_seconds": None,
-            })
+    logging.info(f"Batch analysis complete. Processed {completed} calls.")
 
-        results[call_id] = current_results
 
-        # --- Report Progress (if callback provided and loader didn't handle it) ---
-        if progress_callback:
-            try:
-                # Use filename = call_id + ".json" for consistency if needed
-                progress_callback(i + 1, total_calls, f"{call_id}.json")
-            except Exception as cb_e:
-                logging.warning(
-                    f"Progress callback failed during analysis loop: {cb_e}"
-                )
-
-    logging.info(f"Batch analysis complete. Processed {len(results)} calls.")
-    return dict(results)
+def analyze_all_calls(
+    directory: str,
+    progress_callback: Callable[[int, int, str], None] | None = None,
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+) -> dict[str, dict[str, Any]]:
+    """
+    Analyzes all valid call transcripts in a directory using all available methods.
+
+    Args:
+        directory: Path to the directory containing JSON call files.
+        progress_callback: Optional function to report progress back to the UI.
+                           Should accept (current_count, total_count, filename).
+        max_concurrency: Maximum number of LLM requests in flight at the same time.
+
+    Returns:
+        A dictionary where keys are call_ids and values are dictionaries
+        containing analysis results for that call.
+    """
+    results = {}
+    for completed, total_calls, call_id, current_results in iter_analyze_all_calls(
+        directory, max_concurrency=max_concurrency
+    ):
+        results[call_id] = current_results
+        _report_progress(progress_callback, completed, total_calls, call_id)
+    return results
@@ -0,0 +1,134 @@
+# call_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# pyarrow (installed with Streamlit) provides the Feather format
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    feather = None
+    PYARROW_AVAILABLE = False
+
+# Bump whenever `parse_json_to_df` changes the frames it returns, so that
+# caches written by older code are not served
+_CACHE_VERSION = "3"
+_CALLS_METADATA_KEY = b"calls"
+_SIGNATURE_METADATA_KEY = b"signature"
+
+
+def cache_path(directory: str, cache_dir: str) -> str:
+    """Returns the cache file of `directory`; each directory has one."""
+    key = hashlib.sha256(os.path.realpath(directory).encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.feather")
+
+
+def _signature_digest(files: list[tuple[str, int, int]]) -> bytes:
+    # Editing, adding or removing any call file changes the digest
+    parts = [_CACHE_VERSION, pd.__version__]
+    parts.extend(f"{name}\x01{mtime}\x01{size}" for name, mtime, size in sorted(files))
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest().encode()
+
+
+# Object columns whose values Arrow gives back unchanged (missing values
+# aside); e.g. lists would come back as arrays
+_ARROW_SAFE_OBJECTS = frozenset({"string", "boolean", "empty"})
+
+
+def _arrow_safe(df: pd.DataFrame) -> bool:
+    return all(
+        pd.api.types.infer_dtype(df[col], skipna=True) in _ARROW_SAFE_OBJECTS
+        for col, dtype in df.dtypes.items()
+        if pd.api.types.is_object_dtype(dtype)
+    )
+
+
+def load_cached_calls(
+    path: str, files: list[tuple[str, int, int]]
+) -> dict[str, pd.DataFrame] | None:
+    """
+    Reads the calls stored by `store_cached_calls` if they were parsed from
+    `files`, the (name, mtime_ns, size) of the directory's call files; returns
+    None otherwise. The frames equal the parsed ones, except that the speaker
+    categories are those of the whole directory and that missing values in
+    extra object columns come back as None.
+    """
+    try:
+        table = feather.read_table(path)
+        metadata = table.schema.metadata or {}
+        if metadata.get(_SIGNATURE_METADATA_KEY) != _signature_digest(files):
+            return None  # Stale: written before the files last changed
+        calls = json.loads(metadata[_CALLS_METADATA_KEY])
+    except FileNotFoundError:
+        return None
+    except (OSError, KeyError, ValueError) as e:
+        logging.warning(f"Ignoring unusable call cache {path}: {e}")
+        return None
+
+    combined = table.to_pandas()
+    columns = {col: combined[col].array for col in combined.columns}
+    offsets = np.cumsum([0] + [call["rows"] for call in calls])
+    call_data = {}
+    for call, start, end in zip(calls, offsets[:-1], offsets[1:]):
+        values = {col: columns[col][start:end] for col in call["columns"]}
+        # Concatenating calls with different columns widened some (e.g. int
+        # to float, bool to object); narrow them back
+        for col, dtype in call["dtypes"].items():
+            if values[col].dtype != dtype:
+                values[col] = values[col].astype(dtype)
+        call_data[call["id"]] = pd.DataFrame(values, copy=False)
+    return call_data
+
+
+def store_cached_calls(
+    path: str, files: list[tuple[str, int, int]], call_data: dict[str, pd.DataFrame]
+) -> None:
+    """
+    Stores the calls parsed from `files` as one LZ4-compressed Feather file,
+    replacing the directory's previous cache. Calls with columns that Arrow
+    would not give back as they are (nested or mixed values) are not cached.
+    """
+    if not call_data:
+        return
+    if not all(_arrow_safe(df) for df in call_data.values()):
+        # Extra keys in the call files can hold anything; not worth a format
+        logging.info(f"Not caching calls with nested or mixed values: {path}")
+        return
+    calls = [
+        {
+            "id": call_id,
+            "rows": len(df),
+            "columns": list(df.columns),
+            "dtypes": {
+                col: str(dtype)
+                for col, dtype in df.dtypes.items()
+                if col != "speaker"  # Re-categorized below
+            },
+        }
+        for call_id, df in call_data.items()
+    ]
+    combined = pd.concat(call_data.values(), ignore_index=True)
+    # Calls with different speaker sets concatenate to strings; re-categorize
+    combined["speaker"] = combined["speaker"].astype("category")
+    try:
+        table = pa.Table.from_pandas(combined, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_CALLS_METADATA_KEY] = json.dumps(calls).encode()
+        metadata[_SIGNATURE_METADATA_KEY] = _signature_digest(files)
+        table = table.replace_schema_metadata(metadata)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        feather.write_feather(table, tmp_path, compression="lz4")
+        os.replace(tmp_path, path)
+    except (OSError, pa.ArrowException) as e:
+        logging.warning(f"Could not write call cache {path}: {e}")
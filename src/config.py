@@ -3,6 +3,28 @@ import logging
 import os
 import re
 
+from keyword_matcher import (
+    AHOCORASICK_AVAILABLE,
+    HYPERSCAN_AVAILABLE,
+    AsciiOnlyMatcher,
+    CategoryKeywordMatcher,
+    CategoryView,
+    HyperscanCategoryMatcher,
+    HyperscanMatcher,
+    KeywordMatcher,
+    SeparateCategoryMatcher,
+)
+
+# Prefer RE2 (linear-time, no backtracking) for the keyword regexes when
+# `google-re2` is installed; fall back to the standard library otherwise.
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+
 # --- Basic Configuration ---
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -12,11 +34,100 @@ logging.basicConfig(
 AGENT_SPEAKER_ID = "agent"
 BORROWER_SPEAKER_ID = "customer"
 
+# --- Data Loading ---
+LOAD_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)  # Threads reading call files
+LOAD_MMAP_MIN_BYTES = 1 << 20  # Larger call files are memory-mapped, not read
+LOAD_CACHE_DIR = ".call_cache"  # Parsed calls of each directory, as Feather files
+
+# --- Batch Processing ---
+BATCH_MAX_WORKERS = os.cpu_count() or 1  # Processes for the regex/metrics pass
+BATCH_PARALLEL_MIN_CALLS = 1000  # Smaller batches aren't worth the process start-up
+BATCH_CHUNK_SIZE = 128  # Calls whose metrics share one parallel kernel call
+# Order in which Numba tries threading layers for that kernel. OpenMP comes
+# first: a TBB pool first started from a Streamlit script thread keeps the
+# process from exiting. NUMBA_THREADING_LAYER or a priority already set in
+# the environment take precedence
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+
 # --- LLM Configuration ---
 GEMINI_MODEL_NAME = "gemini-2.0-flash-lite"  # Example model
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+LLM_MAX_CONCURRENCY = 10  # Gemini requests in flight during batch LLM analysis
+LLM_BATCH_SIZE = 8  # Transcripts packed into one Gemini request in batch mode
+LLM_CACHE_PATH = ".llm_cache.sqlite3"  # On-disk cache of Gemini responses
+LLM_CACHE_MEMORY_SIZE = 1024  # Responses kept in the in-memory cache layer
+LLM_RETRY_BASE_DELAY = 1.0  # Seconds; doubled on every retry (with jitter)
+LLM_RETRY_MAX_DELAY = 60.0  # Upper bound for a single retry wait, in seconds
+LLM_REQUEST_TIMEOUT_MS = 60_000  # Per-request HTTP timeout for Gemini calls
+LLM_MAX_CONNECTIONS = 100  # Connection pool size of the async Gemini client
+LLM_MAX_KEEPALIVE_CONNECTIONS = 64  # Idle connections kept (the UI's max concurrency)
+LLM_MAX_PROMPT_CHARS = (
+    200_000  # ~50k tokens (~4 chars/token); longer transcripts are chunked
+)
+LLM_CHUNK_OVERLAP = 0.1  # Fraction of a chunk repeated at the start of the next one
 
 # --- Regex Patterns & Lists ---
+KEYWORD_CACHE_DIR = ".keyword_cache"  # Compiled Hyperscan databases, shared by workers
+
+
+def _keyword_pattern(words: list[str]) -> str:
+    return r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\b"
+
+
+def _keyword_regex(words: list[str]) -> re.Pattern:
+    # The reference matcher: Unicode word boundaries and case folding
+    return re.compile(_keyword_pattern(words), re.IGNORECASE)
+
+
+def _software_matcher(words: list[str]):
+    # RE2 when installed, else an Aho-Corasick automaton, else `re`. The first
+    # two only agree with `re` on ASCII text, so `re` handles everything else
+    if re2 is not None:
+        fast = re2.compile("(?i)" + _keyword_pattern(words))
+    elif AHOCORASICK_AVAILABLE:
+        fast = KeywordMatcher(words)
+    else:
+        return _keyword_regex(words)
+    return AsciiOnlyMatcher(fast, fallback=_keyword_regex(words))
+
+
+def compile_keyword_regex(words: list[str]):
+    """
+    Compiles a case-insensitive, whole-word matcher for `words`: Hyperscan,
+    RE2 or an Aho-Corasick automaton, whichever is installed first, for ASCII
+    text, and a standard `re` alternation for the rest (or for everything).
+    All of them answer `.search(text)` exactly as the `re` alternation would.
+    """
+    if HYPERSCAN_AVAILABLE:
+        return HyperscanMatcher(
+            _keyword_pattern(words),
+            fallback=_keyword_regex(words),
+            cache_dir=KEYWORD_CACHE_DIR,
+        )
+    return _software_matcher(words)
+
+
+def compile_keyword_categories(categories: dict[str, list[str]]):
+    """
+    Compiles one matcher for several named keyword lists whose `.categories(text)`
+    returns the names of the lists with a hit, scanning ASCII text once when
+    Hyperscan or Aho-Corasick is installed (once per list otherwise). As in
+    `compile_keyword_regex`, non-ASCII text always goes to the `re` regexes.
+    """
+    exact = SeparateCategoryMatcher({
+        name: _keyword_regex(words) for name, words in categories.items()
+    })
+    if HYPERSCAN_AVAILABLE:
+        patterns = {name: _keyword_pattern(words) for name, words in categories.items()}
+        return HyperscanCategoryMatcher(
+            patterns, fallback=exact, cache_dir=KEYWORD_CACHE_DIR
+        )
+    if AHOCORASICK_AVAILABLE:
+        return AsciiOnlyMatcher(CategoryKeywordMatcher(categories), fallback=exact)
+    return SeparateCategoryMatcher({
+        name: _software_matcher(words) for name, words in categories.items()
+    })
+
 
 # Profanity
 PROFANE_WORDS = [
@@ -69,10 +180,6 @@ PROFANE_WORDS = [
     "moron",
     "stupid",
 ]
-PROFANITY_REGEX = re.compile(
-    r"\b(?:" + "|".join(re.escape(word) for word in PROFANE_WORDS) + r")\b",
-    re.IGNORECASE,
-)
 
 # Privacy - Sensitive Info
 SENSITIVE_INFO_KEYWORDS = [
@@ -106,10 +213,6 @@ SENSITIVE_INFO_KEYWORDS = [
     "personal identification number",
     "pin",
 ]
-SENSITIVE_REGEX = re.compile(
-    r"\b(?:" + "|".join(re.escape(word) for word in SENSITIVE_INFO_KEYWORDS) + r")\b",
-    re.IGNORECASE,
-)
 
 # Privacy - Verification
 VERIFICATION_KEYWORDS = [
@@ -143,9 +246,17 @@ VERIFICATION_KEYWORDS = [
     "confirm",
     "authenticate",
 ]
-VERIFY_REGEX = re.compile(
-    r"\b(?:" + "|".join(re.escape(word) for word in VERIFICATION_KEYWORDS) + r")\b",
-    re.IGNORECASE,
-)
+
+# All three lists in one matcher, for analyses that need several per utterance
+KEYWORD_CATEGORIES = compile_keyword_categories({
+    "profanity": PROFANE_WORDS,
+    "sensitive": SENSITIVE_INFO_KEYWORDS,
+    "verification": VERIFICATION_KEYWORDS,
+})
+
+# Single-list views of KEYWORD_CATEGORIES, so each list is compiled only once
+PROFANITY_REGEX = CategoryView(KEYWORD_CATEGORIES, "profanity")
+SENSITIVE_REGEX = CategoryView(KEYWORD_CATEGORIES, "sensitive")
+VERIFY_REGEX = CategoryView(KEYWORD_CATEGORIES, "verification")
 
 # --- Add other constants as needed ---
@@ -1,72 +1,215 @@
 # data_loader.py
 import json
 import logging
+import mmap
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import singledispatch
+from itertools import chain
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from call_cache import (
+    PYARROW_AVAILABLE,
+    cache_path,
+    load_cached_calls,
+    store_cached_calls,
+)
+from config import LOAD_CACHE_DIR, LOAD_MAX_WORKERS, LOAD_MMAP_MIN_BYTES
+
+# orjson is optional: a faster drop-in for json.loads (its errors subclass
+# json.JSONDecodeError) that parses UTF-8 bytes without decoding them first
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# pysimdjson is optional too: its parsers keep their buffers between
+# documents, so each loader thread reuses one
+try:
+    import simdjson
+
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    simdjson = None
+    SIMDJSON_AVAILABLE = False
+
+_thread_local = threading.local()
+
+
+def _simdjson_loads(content: str | bytes) -> Any:
+    """`json.loads` on a reused, per-thread `simdjson.Parser`."""
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = _thread_local.parser = simdjson.Parser()
+    try:
+        # Fully converted to Python objects: a parser's document proxies are
+        # invalidated by its next parse
+        return parser.parse(content, True)
+    except ValueError as e:
+        raise json.JSONDecodeError(str(e), "", 0) from e
+
+
+# The JSON parser is picked once, fastest installed first, so parsing a file
+# never branches on it. Both optional parsers also accept buffers (memoryview)
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+elif SIMDJSON_AVAILABLE:
+    _json_loads = _simdjson_loads
+else:
+    _json_loads = json.loads
+_JSON_LOADS_BUFFERS = _json_loads is not json.loads
+
 # We avoid streamlit imports here for better separation
 
+# Columns every transcript must have (the analyzers read nothing else)
+REQUIRED_COLUMNS = frozenset({"speaker", "text", "stime", "etime"})
+
+
+def _record_columns(records: list[dict]) -> dict[str, list]:
+    """
+    Collects the columns of a list of JSON records into one list per column
+    in a single pass, so pandas builds the frame from columns instead of
+    re-scanning every dict. As with `pd.DataFrame(records)`, every key any
+    record has is a column (keys beyond `REQUIRED_COLUMNS` are kept too),
+    columns come in order of first appearance, and records without the key
+    get NaN.
+    """
+    present = dict.fromkeys(chain.from_iterable(records))  # Ordered set
+    values = {col: [] for col in present}
+    appends = [(col, values[col].append) for col in present]
+    nan = float("nan")
+    for record in records:
+        for col, append in appends:
+            append(record.get(col, nan))
+    return values
+
+
+def _numeric_array(values: Any) -> np.ndarray:
+    """
+    `pd.to_numeric(values, errors="coerce")` as an array. JSON times are
+    nearly always plain ints and floats, which NumPy converts directly; only
+    anything else goes through the per-element coercion.
+    """
+    try:
+        array = np.asarray(values)
+    except ValueError:  # e.g. nested lists
+        array = None
+    if array is not None and array.dtype.kind in "iuf":
+        return array
+    return np.asarray(pd.to_numeric(values, errors="coerce"))
+
+
+def _normalized_categorical(values: pd.Series) -> pd.Categorical:
+    """
+    `values.astype(str).str.strip().str.lower()` as a categorical. A speaker
+    column holds only a handful of distinct labels: pandas factorizes the rows
+    in C, each distinct label is normalized once, and the row codes are
+    remapped with one NumPy take.
+    """
+    labels = values.to_numpy()
+    if pd.api.types.infer_dtype(labels, skipna=False) != "string":
+        labels = values.astype(str).to_numpy()
+    codes, uniques = pd.factorize(labels)
+    normalized = [label.strip().lower() for label in uniques]
+    categories = sorted(set(normalized))
+    code_of = {category: code for code, category in enumerate(categories)}
+    remap = np.array([code_of[clean] for clean in normalized], dtype=codes.dtype)
+    return pd.Categorical.from_codes(remap[codes], categories, validate=False)
+
+
+@singledispatch
+def _json_data(json_file_content: Any) -> Any:
+    """
+    Returns the parsed JSON records of a `parse_json_to_df` input, dispatched
+    on its type. Anything unregistered must be file-like (e.g. an uploaded
+    file); other types are unsupported and give None.
+    """
+    if hasattr(json_file_content, "read"):
+        # Bytes go to the parser as they are; all the parsers accept UTF-8
+        # bytes, so decoding them first would only copy the content
+        return _json_loads(json_file_content.read())
+    logging.error(f"Unsupported input type for JSON parsing: {type(json_file_content)}")
+    return None
+
+
+@_json_data.register(str)
+@_json_data.register(bytes)
+@_json_data.register(memoryview)  # A buffer, see _JSON_LOADS_BUFFERS
+def _(json_file_content: str | bytes | memoryview) -> Any:
+    return _json_loads(json_file_content)
+
+
+@_json_data.register(list)
+def _(json_file_content: list) -> list:
+    return json_file_content  # Assume it's already parsed list of dicts
+
 
 def parse_json_to_df(json_file_content: Any) -> pd.DataFrame | None:
     """Parses JSON content (from uploaded file or opened file) into a Pandas DataFrame."""
     try:
-        # Handle file-like objects (uploaded file) vs. lists (direct data)
-        if hasattr(json_file_content, "read"):
-            json_data_str = json_file_content.read()
-            # Decode if bytes
-            if isinstance(json_data_str, bytes):
-                json_data_str = json_data_str.decode("utf-8")
-            data = json.loads(json_data_str)
-        elif isinstance(
-            json_file_content, (str, bytes)
-        ):  # Handle raw string/bytes content
-            if isinstance(json_file_content, bytes):
-                json_data_str = json_file_content.decode("utf-8")
-            else:
-                json_data_str = json_file_content
-            data = json.loads(json_data_str)
-        elif isinstance(json_file_content, list):
-            data = json_file_content  # Assume it's already parsed list of dicts
+        data = _json_data(json_file_content)
+        if data is None:
+            return None  # Unsupported input (logged) or a JSON `null`
+
+        # Each column's dtype is inferred once, as pandas builds a frame; the
+        # cleaned columns then go into the result in a single construction
+        if isinstance(data, list):
+            raw = pd.DataFrame(_record_columns(data))
         else:
+            raw = pd.DataFrame(data)  # e.g. a JSON object of columns
+        missing_cols = REQUIRED_COLUMNS.difference(raw.columns)
+        if missing_cols:
             logging.error(
-                f"Unsupported input type for JSON parsing: {type(json_file_content)}"
+                f"JSON data is missing required columns: {sorted(missing_cols)}"
             )
-            # Raise error or return None, depending on desired handling
-            # raise TypeError(f"Unsupported input type: {type(json_file_content)}")
-            return None  # Keep consistent with original return type
-
-        df = pd.DataFrame(data)
-        required_cols = ["speaker", "text", "stime", "etime"]
-        if not all(col in df.columns for col in required_cols):
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            logging.error(f"JSON data is missing required columns: {missing_cols}")
             # Optionally raise an exception here too
             return None
+        columns = {col: values.to_numpy() for col, values in raw.items()}
 
         # Data cleaning and validation
-        df["stime"] = pd.to_numeric(df["stime"], errors="coerce")
-        df["etime"] = pd.to_numeric(df["etime"], errors="coerce")
-        df["speaker"] = df["speaker"].astype(str).str.strip().str.lower()
-        df["text"] = df["text"].astype(str)
-
-        df = df.dropna(subset=["stime", "etime", "speaker"])
-        if df.empty:
-            logging.warning("DataFrame is empty after dropping NaNs in core columns.")
-            return None
+        stime = _numeric_array(columns["stime"])
+        etime = _numeric_array(columns["etime"])
+        columns["stime"] = stime
+        columns["etime"] = etime
+        # Normalized speakers are strings, so they are never NaN
+        columns["speaker"] = _normalized_categorical(raw["speaker"])
+        # Texts are nearly always strings already; checking every value (in
+        # C) is cheaper than copying the column
+        if pd.api.types.infer_dtype(columns["text"], skipna=False) != "string":
+            columns["text"] = raw["text"].astype(str).to_numpy()
 
-        # Ensure etime >= stime and calculate duration
-        df["duration"] = df["etime"] - df["stime"]
-        df = df[df["duration"] >= 0]
-
-        if df.empty:
-            logging.warning(
-                "DataFrame is empty after filtering negative duration utterances."
-            )
+        # Rows without both times, or ending before they start, are dropped
+        # with one mask (the comparison is False where a time is NaN)
+        duration = etime - stime
+        keep = duration >= 0
+        if not keep.any():
+            if (pd.isna(stime) | pd.isna(etime)).all():
+                logging.warning(
+                    "DataFrame is empty after dropping NaNs in core columns."
+                )
+            else:
+                logging.warning(
+                    "DataFrame is empty after filtering negative duration utterances."
+                )
             return None
+        columns["duration"] = duration
 
-        return df
+        # Sort once here so the analyzers don't each have to re-sort by time.
+        # The kept rows are ordered by start time first (as sort_values would
+        # order them), so every column is filtered and sorted by one take and
+        # the frame is built once, from the final arrays
+        rows = np.flatnonzero(keep)
+        rows = rows[np.argsort(stime[rows], kind="quicksort")]
+        return pd.DataFrame(
+            {col: values[rows] for col, values in columns.items()}, copy=False
+        )
 
     except json.JSONDecodeError as e:
         logging.error(f"Error decoding JSON: {e}")
@@ -80,6 +223,75 @@ def parse_json_to_df(json_file_content: Any) -> pd.DataFrame | None:
         return None
 
 
+def sort_call_df(call_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the transcript ordered by start time. DataFrames produced by
+    `parse_json_to_df` are already sorted, so for them this is only an O(n) check.
+    """
+    if call_df["stime"].is_monotonic_increasing:
+        return call_df
+    return call_df.sort_values(by="stime").reset_index(drop=True)
+
+
+def _parse_mapped_file(file) -> pd.DataFrame | None:
+    """
+    Parses a large call file straight from a read-only memory map, so its
+    content is never copied into a bytes object. Needs orjson or pysimdjson,
+    which (unlike `json.loads`) accept any buffer.
+    """
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):  # Not on every platform
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        # The view must be released before the map can be closed
+        with memoryview(mapped) as view:
+            return parse_json_to_df(view)
+
+
+def _load_call_file(entry: os.DirEntry) -> pd.DataFrame | None:
+    """Reads and parses one call file; returns None if it is unusable."""
+    filename = entry.name
+    # Only reading can fail here: parse_json_to_df catches and logs its own
+    # errors, returning None, so programming errors are no longer swallowed
+    try:
+        # The entry's stat is cached when the call cache signature was taken
+        size = entry.stat().st_size
+        with open(entry.path, "rb") as file:
+            if _JSON_LOADS_BUFFERS and size >= LOAD_MMAP_MIN_BYTES:
+                df = _parse_mapped_file(file)
+            else:
+                # Pass the raw file bytes to the parser, undecoded. With the
+                # size known, read() needs no fstat of its own
+                df = parse_json_to_df(file.read(size))
+    except (OSError, ValueError) as e:  # ValueError: mapping an emptied file
+        logging.error(f"Failed to load or process file {filename}: {e}")
+        # Optionally report this specific file error via callback or just log it
+        return None
+    if df is not None and not df.empty:
+        logging.debug(f"Successfully loaded and parsed {filename}")
+        return df
+    # parse_json_to_df logs specific errors
+    logging.warning(f"Skipping file {filename} due to parsing errors or empty data.")
+    return None
+
+
+def _file_signature(entries: list[os.DirEntry]) -> list[tuple[str, int, int]]:
+    """(name, mtime_ns, size) of each file, identifying the directory's state."""
+    signature = []
+    for entry in entries:
+        stat = entry.stat()  # Cached on the entry for later use
+        signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return signature
+
+
+def _report_progress(progress_callback, current: int, total: int, filename: str):
+    # Report progress if callback is provided
+    if progress_callback:
+        try:
+            progress_callback(current, total, filename)
+        except Exception as cb_e:
+            logging.warning(f"Progress callback failed: {cb_e}")
+
+
 def load_all_calls(directory: str, progress_callback=None) -> dict[str, pd.DataFrame]:
     """
     Loads all JSON call transcripts from a specified directory into a dictionary.
@@ -98,8 +310,15 @@ def load_all_calls(directory: str, progress_callback=None) -> dict[str, pd.DataF
         # Caller should handle UI feedback (e.g., st.error)
         return call_data  # Return empty dict
 
+    # scandir's entries carry the file type, so only regular files are kept
+    # (directories named *.json used to fail on open) without a stat call
     try:
-        files_to_process = [f for f in os.listdir(directory) if f.endswith(".json")]
+        with os.scandir(directory) as it:
+            files_to_process = [
+                entry
+                for entry in it
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
     except OSError as e:
         logging.error(f"Error listing directory {directory}: {e}")
         return call_data  # Return empty dict
@@ -110,36 +329,46 @@ def load_all_calls(directory: str, progress_callback=None) -> dict[str, pd.DataF
         return call_data
 
     total_files = len(files_to_process)
-    for i, filename in enumerate(files_to_process):
-        call_id = filename.replace(".json", "")
-        filepath = os.path.join(directory, filename)
+    # Parsed calls are cached on disk per directory state, see call_cache.py
+    cache_file = None
+    if PYARROW_AVAILABLE:
         try:
-            with open(filepath, encoding="utf-8") as file:
-                # Pass the raw file content string/bytes to the parser
-                content = file.read()
-                df = parse_json_to_df(content)
-                if df is not None and not df.empty:
-                    call_data[call_id] = df
-                    logging.debug(f"Successfully loaded and parsed {filename}")
-                else:
-                    # parse_json_to_df logs specific errors
-                    logging.warning(
-                        f"Skipping file {filename} due to parsing errors or empty data."
-                    )
-        except Exception as e:
-            logging.error(f"Failed to load or process file {filename}: {e}")
-            # Optionally report this specific file error via callback or just log it
-
-        # Report progress if callback is provided
-        if progress_callback:
-            try:
-                progress_callback(i + 1, total_files, filename)
-            except Exception as cb_e:
-                logging.warning(f"Progress callback failed: {cb_e}")
+            signature = _file_signature(files_to_process)
+            cache_file = cache_path(directory, LOAD_CACHE_DIR)
+        except OSError as e:
+            logging.warning(f"Not using the call cache for {directory}: {e}")
+    if cache_file is not None:
+        cached = load_cached_calls(cache_file, signature)
+        if cached is not None:
+            logging.info(f"Loaded {len(cached)} calls of {directory} from cache.")
+            _report_progress(
+                progress_callback, total_files, total_files, files_to_process[-1].name
+            )
+            return cached
+
+    # Files are read and parsed in a thread pool, overlapping the file I/O.
+    # Progress is reported as files finish; the calls keep listing order.
+    loaded = {}
+    with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_load_call_file, entry): entry.name
+            for entry in files_to_process
+        }
+        for i, future in enumerate(as_completed(futures)):
+            filename = futures[future]
+            loaded[filename] = future.result()
+
+            _report_progress(progress_callback, i + 1, total_files, filename)
+
+    for entry in files_to_process:
+        if loaded[entry.name] is not None:
+            call_data[entry.name[: -len(".json")]] = loaded[entry.name]
 
     logging.info(
         f"Successfully loaded {len(call_data)} calls out of {total_files} files found."
     )
+    if cache_file is not None:
+        store_cached_calls(cache_file, signature, call_data)
     if not call_data and files_to_process:
         logging.warning(
             "Finished loading, but no valid call data could be processed from the found files."
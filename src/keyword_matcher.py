@@ -0,0 +1,333 @@
+# keyword_matcher.py
+import hashlib
+import logging
+import os
+import threading
+
+# Aho-Corasick is optional: `pyahocorasick` finds every keyword in one pass
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+# Hyperscan is optional: it compiles the whole alternation to a SIMD automaton
+try:
+    import hyperscan
+
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _is_word_boundary(text: str, pos: int) -> bool:
+    """Same test as the regex `\\b` assertion at `pos`."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive, whole-word keyword matcher built on an Aho-Corasick
+    automaton. `search` has the same contract as the compiled keyword regexes
+    (a truthy result on a match, None otherwise), so it is a drop-in for them.
+    """
+
+    def __init__(self, words: list[str]):
+        self._automaton = ahocorasick.Automaton()
+        for word in words:
+            keyword = word.lower()
+            self._automaton.add_word(keyword, len(keyword))
+        self._automaton.make_automaton()
+
+    def search(self, text: str) -> tuple[int, int] | None:
+        """Returns the (start, end) span of the first whole-word hit, or None."""
+        lowered = text.lower()
+        for last, length in self._automaton.iter(lowered):
+            start, end = last - length + 1, last + 1
+            if _is_word_boundary(lowered, start) and _is_word_boundary(lowered, end):
+                return start, end
+        return None
+
+
+class CategoryKeywordMatcher:
+    """
+    Case-insensitive, whole-word matcher for several named keyword lists at
+    once, built on one Aho-Corasick automaton: `categories` reports every list
+    with a hit in a single pass over the text.
+    """
+
+    def __init__(self, categories: dict[str, list[str]]):
+        # A keyword can belong to several lists, so each entry keeps all of them
+        names_by_keyword: dict[str, set[str]] = {}
+        for name, words in categories.items():
+            for word in words:
+                names_by_keyword.setdefault(word.lower(), set()).add(name)
+        self._automaton = ahocorasick.Automaton()
+        for keyword, names in names_by_keyword.items():
+            self._automaton.add_word(keyword, (frozenset(names), len(keyword)))
+        self._automaton.make_automaton()
+        self._all = frozenset(categories)
+
+    def categories(self, text: str) -> frozenset[str]:
+        """Returns the names of the keyword lists with a whole-word hit."""
+        lowered = text.lower()
+        found = frozenset()
+        for last, (names, length) in self._automaton.iter(lowered):
+            if names <= found:
+                continue
+            start, end = last - length + 1, last + 1
+            if _is_word_boundary(lowered, start) and _is_word_boundary(lowered, end):
+                found |= names
+                if found == self._all:
+                    break
+        return found
+
+    def has_category(self, text: str, category: str) -> bool:
+        """Whether the `category` list has a whole-word hit; stops at the first."""
+        lowered = text.lower()
+        for last, (names, length) in self._automaton.iter(lowered):
+            if category not in names:
+                continue
+            start, end = last - length + 1, last + 1
+            if _is_word_boundary(lowered, start) and _is_word_boundary(lowered, end):
+                return True
+        return False
+
+
+class SeparateCategoryMatcher:
+    """
+    `CategoryKeywordMatcher` contract on top of one matcher per keyword list,
+    for when no single-pass automaton is available; scans once per list.
+    """
+
+    def __init__(self, matchers: dict):
+        self._matchers = matchers
+
+    def categories(self, text: str) -> frozenset[str]:
+        """Returns the names of the keyword lists with a whole-word hit."""
+        return frozenset(
+            name
+            for name, matcher in self._matchers.items()
+            if matcher.search(text) is not None
+        )
+
+    def has_category(self, text: str, category: str) -> bool:
+        """Whether the `category` list has a whole-word hit; scans only it."""
+        return self._matchers[category].search(text) is not None
+
+
+class AsciiOnlyMatcher:
+    """
+    Hands ASCII text to `matcher` and everything else to `fallback`, for
+    matchers that only agree with Python's `re` on ASCII: RE2's `\\b` knows
+    only ASCII word characters, and `str.lower()` in the Aho-Corasick
+    matchers can change the length of non-ASCII text. `fallback` should be
+    the `re` equivalent. Forwards `search`, or `categories` and
+    `has_category`, whichever the two matchers provide.
+    """
+
+    def __init__(self, matcher, fallback):
+        self._matcher = matcher
+        self._fallback = fallback
+
+    def search(self, text: str):
+        """Same contract as the wrapped matchers' `search`."""
+        if text.isascii():
+            return self._matcher.search(text)
+        return self._fallback.search(text)
+
+    def categories(self, text: str) -> frozenset[str]:
+        """Returns the names of the keyword lists with a whole-word hit."""
+        if text.isascii():
+            return self._matcher.categories(text)
+        return self._fallback.categories(text)
+
+    def has_category(self, text: str, category: str) -> bool:
+        """Whether the `category` list has a whole-word hit."""
+        if text.isascii():
+            return self._matcher.has_category(text, category)
+        return self._fallback.has_category(text, category)
+
+
+class CategoryView:
+    """
+    One keyword list of a category matcher, with the `search` contract of the
+    compiled keyword regexes (True on a hit, None otherwise), so the list
+    needs no matcher of its own.
+    """
+
+    def __init__(self, matcher, category: str):
+        self._matcher = matcher
+        self._category = category
+
+    def search(self, text: str) -> bool | None:
+        """Returns True on the first whole-word hit, or None."""
+        return True if self._matcher.has_category(text, self._category) else None
+
+
+def _hyperscan_flags() -> int:
+    return hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+
+
+def _compile_database(patterns: list[str]):
+    """Compiles `patterns` into one database; each pattern's id is its index."""
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[pattern.encode("ascii") for pattern in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[_hyperscan_flags()] * len(patterns),
+    )
+    return database
+
+
+def _cached_database(patterns: list[str], cache_dir: str):
+    """
+    Loads the compiled database for `patterns` from `cache_dir`, compiling and
+    storing it on a miss. Compiling takes ~20 ms per keyword list, paid again
+    by every spawned worker process; loading takes microseconds.
+    """
+    key = hashlib.sha256(
+        "\x00".join([
+            hyperscan.__version__,
+            str(_hyperscan_flags()),
+            *patterns,
+        ]).encode()
+    ).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.hsdb")
+    try:
+        with open(path, "rb") as file:
+            return hyperscan.loadb(file.read(), hyperscan.HS_MODE_BLOCK)
+    except FileNotFoundError:
+        pass
+    except (OSError, hyperscan.error) as e:
+        logging.warning(f"Ignoring unusable keyword cache {path}: {e}")
+
+    database = _compile_database(patterns)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename, as worker processes may populate the cache at once
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(hyperscan.dumpb(database))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write keyword cache {path}: {e}")
+    return database
+
+
+class _HyperscanScanner:
+    """
+    Block-mode Hyperscan database over one or more patterns (a pattern's match
+    id is its index), with per-thread scratch space.
+    """
+
+    def __init__(self, patterns: list[str], cache_dir: str | None = None):
+        if cache_dir is None:
+            self._database = _compile_database(patterns)
+        else:
+            self._database = _cached_database(patterns, cache_dir)
+        self._scratch = hyperscan.Scratch(self._database)
+        self._local = threading.local()
+
+    def _thread_scratch(self):
+        # Scratch space can't be shared by concurrent scans; one per thread
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = self._scratch.clone()
+        return scratch
+
+    def _scan(self, text: str, on_match) -> None:
+        # `on_match(match_id)` returns True to stop the scan
+        try:
+            self._database.scan(
+                text.encode("ascii"),
+                match_event_handler=lambda match_id, *_: on_match(match_id),
+                scratch=self._thread_scratch(),
+            )
+        except hyperscan.ScanTerminated:
+            pass
+
+
+class HyperscanMatcher(_HyperscanScanner):
+    """
+    Case-insensitive, whole-word keyword matcher backed by a Hyperscan block
+    database, with the same `search` contract as the compiled keyword regexes.
+
+    Hyperscan's `\\b` and caseless matching are ASCII-only (it rejects `\\b` in
+    Unicode mode), so they agree with Python's `re` exactly on ASCII text;
+    anything else is handed to `fallback`, which should be the `re`
+    equivalent (see `AsciiOnlyMatcher`). With `cache_dir`, the compiled
+    database is stored on disk and reused by later processes.
+    """
+
+    def __init__(self, pattern: str, fallback, cache_dir: str | None = None):
+        super().__init__([pattern], cache_dir)
+        self._fallback = fallback
+
+    def search(self, text: str):
+        """Returns a truthy value (True on the first hit), or None."""
+        if not text.isascii():
+            return self._fallback.search(text)
+        hits = []
+
+        def on_match(match_id):
+            hits.append(True)
+            return True  # stop scanning
+
+        self._scan(text, on_match)
+        return hits[0] if hits else None
+
+
+class HyperscanCategoryMatcher(_HyperscanScanner):
+    """
+    `CategoryKeywordMatcher` contract on one Hyperscan database holding a
+    pattern per keyword list, so the text is scanned once for all of them.
+    Non-ASCII text is handed to `fallback`, as in `HyperscanMatcher`.
+    """
+
+    def __init__(
+        self, patterns: dict[str, str], fallback, cache_dir: str | None = None
+    ):
+        super().__init__(list(patterns.values()), cache_dir)
+        self._names = list(patterns)
+        self._fallback = fallback
+
+    def categories(self, text: str) -> frozenset[str]:
+        """Returns the names of the keyword lists with a whole-word hit."""
+        if not text.isascii():
+            return self._fallback.categories(text)
+        found = set()
+
+        def on_match(match_id):
+            # SINGLEMATCH reports each pattern at most once
+            found.add(self._names[match_id])
+            return len(found) == len(self._names)
+
+        self._scan(text, on_match)
+        return frozenset(found)
+
+    def has_category(self, text: str, category: str) -> bool:
+        """Whether the `category` list has a whole-word hit; stops at the first."""
+        if not text.isascii():
+            return self._fallback.has_category(text, category)
+        target = self._names.index(category)
+        hits = []
+
+        def on_match(match_id):
+            if match_id != target:
+                return False
+            hits.append(True)
+            return True  # stop scanning
+
+        self._scan(text, on_match)
+        return bool(hits)
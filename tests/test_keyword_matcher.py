@@ -0,0 +1,127 @@
+# tests/test_keyword_matcher.py
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import config  # noqa: E402
+import keyword_matcher  # noqa: E402
+from keyword_matcher import (  # noqa: E402
+    AsciiOnlyMatcher,
+    CategoryKeywordMatcher,
+    HyperscanCategoryMatcher,
+    HyperscanMatcher,
+    KeywordMatcher,
+    SeparateCategoryMatcher,
+)
+
+# Overlapping keywords, and keywords with spaces, apostrophes and symbols
+WORDS = [
+    "pin",
+    "ssn",
+    "social",
+    "social security number",
+    "last four digits",
+    "last four digits of your social",
+    "mother's maiden name",
+    "account #",
+]
+OTHER_WORDS = ["verify", "social", "zip code"]
+
+TEXTS = [
+    "",
+    "PIN",
+    "my pin.",
+    "(ssn)",
+    "pin-code",
+    "pin1",
+    "1pin",
+    "pin 1234",
+    "pin_code",
+    "_ssn",
+    "ssn_",
+    "socials",
+    "social security numbers",
+    "the last four digits of your social, please",
+    "Mother's Maiden Name?",
+    "mother’s maiden name",  # Typographic apostrophe
+    "account #1",
+    "account # 1",
+    "account #",
+    "Über pin",
+    "pinñ",
+    "ñpin",
+    "İ pin",  # Lowers to a longer string
+    "ｐｉｎ",  # Fullwidth letters
+    "verify your zip code",
+    "VERIFY",
+]
+
+
+def _keyword_backends(words: list[str]) -> dict:
+    """Every `search` backend available here, each as the app wraps it."""
+    exact = config._keyword_regex(words)
+    backends = {"compile_keyword_regex": config.compile_keyword_regex(words)}
+    if config.RE2_AVAILABLE:
+        re2_regex = config.re2.compile("(?i)" + config._keyword_pattern(words))
+        backends["re2"] = AsciiOnlyMatcher(re2_regex, fallback=exact)
+    if keyword_matcher.AHOCORASICK_AVAILABLE:
+        backends["ahocorasick"] = AsciiOnlyMatcher(KeywordMatcher(words), exact)
+    if keyword_matcher.HYPERSCAN_AVAILABLE:
+        backends["hyperscan"] = HyperscanMatcher(
+            config._keyword_pattern(words), fallback=exact
+        )
+    return backends
+
+
+def _category_backends(
+    categories: dict[str, list[str]],
+) -> tuple[SeparateCategoryMatcher, dict]:
+    """The `re` reference and every category backend available here."""
+    exact = SeparateCategoryMatcher({
+        name: config._keyword_regex(words) for name, words in categories.items()
+    })
+    backends = {
+        "compile_keyword_categories": config.compile_keyword_categories(categories)
+    }
+    if keyword_matcher.AHOCORASICK_AVAILABLE:
+        backends["ahocorasick"] = AsciiOnlyMatcher(
+            CategoryKeywordMatcher(categories), fallback=exact
+        )
+    if keyword_matcher.HYPERSCAN_AVAILABLE:
+        patterns = {
+            name: config._keyword_pattern(words) for name, words in categories.items()
+        }
+        backends["hyperscan"] = HyperscanCategoryMatcher(patterns, fallback=exact)
+    return exact, backends
+
+
+class KeywordBackendTest(unittest.TestCase):
+    """The optional backends must answer exactly as the `re` alternation."""
+
+    def test_search_matches_re(self):
+        expected = config._keyword_regex(WORDS)
+        for name, backend in _keyword_backends(WORDS).items():
+            for text in TEXTS:
+                with self.subTest(backend=name, text=text):
+                    self.assertEqual(
+                        backend.search(text) is not None,
+                        expected.search(text) is not None,
+                    )
+
+    def test_categories_match_re(self):
+        exact, backends = _category_backends({"sensitive": WORDS, "other": OTHER_WORDS})
+        for name, backend in backends.items():
+            for text in TEXTS:
+                with self.subTest(backend=name, text=text):
+                    self.assertEqual(backend.categories(text), exact.categories(text))
+                    for category in ("sensitive", "other"):
+                        self.assertEqual(
+                            backend.has_category(text, category),
+                            exact.has_category(text, category),
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_llm_analyzer.py
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import llm_analyzer  # noqa: E402
+from analysis.llm_cache import LLMResponseCache  # noqa: E402
+
+VALID_ANSWER = (
+    '{"agent_profanity": "Yes", "borrower_profanity": "No", "agent_violation": "No"}'
+)
+TRUNCATED_ANSWER = '{"agent_profanity": "Ye'
+
+
+class _FakeModels:
+    """Stands in for `client.models`, answering with `replies` in turn."""
+
+    def __init__(self, replies: list[str]):
+        self.replies = replies
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        text = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return SimpleNamespace(
+            prompt_feedback=None, candidates=[text], text=text, parsed=None
+        )
+
+
+class AnalyzeCallLLMCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache = LLMResponseCache(os.path.join(tmp_dir.name, "llm_cache.sqlite3"))
+        self.addCleanup(lambda: cache._conn and cache._conn.close())
+        self.models = _FakeModels([TRUNCATED_ANSWER, VALID_ANSWER])
+        client = SimpleNamespace(models=self.models)
+        for name, value in [
+            ("_RESPONSE_CACHE", cache),
+            ("_get_async_client", lambda: client),
+            ("get_genai_client", lambda: client),
+        ]:
+            patcher = mock.patch.object(llm_analyzer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.call_df = pd.DataFrame({
+            "speaker": ["agent", "customer"],
+            "text": ["Hello", "Hi"],
+            "stime": [0.0, 2.0],
+            "etime": [1.0, 3.0],
+        })
+
+    def test_invalid_answer_is_not_cached(self):
+        first = llm_analyzer.analyze_all_llm(self.call_df)
+        self.assertEqual(first, llm_analyzer._empty_results())
+        self.assertEqual(self.models.calls, 1)
+
+        # The truncated answer was not replayed: Gemini is asked again
+        second = llm_analyzer.analyze_all_llm(self.call_df)
+        self.assertTrue(second["agent_profanity_llm"])
+        self.assertEqual(self.models.calls, 2)
+
+        # The valid answer is cached
+        third = llm_analyzer.analyze_all_llm(self.call_df)
+        self.assertEqual(third, second)
+        self.assertEqual(self.models.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
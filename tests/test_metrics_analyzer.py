@@ -0,0 +1,79 @@
+# tests/test_metrics_analyzer.py
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import metrics_analyzer  # noqa: E402
+
+# (speaker, stime, etime): the agent talks over itself from 2 to 4, and the
+# borrower talks over the agent from 8 to 10
+UTTERANCES = [
+    ("agent", 0.0, 10.0),
+    ("agent", 2.0, 4.0),
+    ("customer", 8.0, 12.0),
+]
+
+
+def _sweep_args(utterances):
+    speakers = np.array([speaker for speaker, _, _ in utterances])
+    return (
+        np.array([stime for _, stime, _ in utterances]),
+        np.array([etime for _, _, etime in utterances]),
+        (speakers == "agent").astype(np.int64),
+        (speakers == "customer").astype(np.int64),
+    )
+
+
+def _sweep_kernels():
+    kernels = {
+        "numpy": metrics_analyzer._sweep_line_numpy,
+        "loop": metrics_analyzer._sweep_line_loop,
+    }
+    if metrics_analyzer.NUMBA_AVAILABLE:
+        kernels["numba"] = metrics_analyzer._sweep_line
+    return kernels
+
+
+class SweepLineOvertalkTest(unittest.TestCase):
+    def test_same_speaker_overlap_is_not_overtalk(self):
+        for name, sweep_line in _sweep_kernels().items():
+            with self.subTest(kernel=name):
+                merged, overlap = sweep_line(*_sweep_args(UTTERANCES[:2]))
+                self.assertAlmostEqual(merged, 10.0)
+                self.assertAlmostEqual(overlap, 0.0)
+
+    def test_agent_borrower_overlap_is_overtalk(self):
+        for name, sweep_line in _sweep_kernels().items():
+            with self.subTest(kernel=name):
+                merged, overlap = sweep_line(*_sweep_args(UTTERANCES))
+                self.assertAlmostEqual(merged, 12.0)
+                self.assertAlmostEqual(overlap, 2.0)
+
+    def test_batch_kernel_matches_single_calls(self):
+        calls = [UTTERANCES[:2], UTTERANCES]
+        arrays = [_sweep_args(utterances) for utterances in calls]
+        offsets = np.array([0, len(calls[0]), len(calls[0]) + len(calls[1])])
+        merged, overlap = metrics_analyzer._sweep_lines(
+            *(np.concatenate([args[k] for args in arrays]) for k in range(4)),
+            offsets,
+        )
+        np.testing.assert_allclose(merged, [10.0, 12.0])
+        np.testing.assert_allclose(overlap, [0.0, 2.0])
+
+    def test_call_metrics(self):
+        call_df = pd.DataFrame(UTTERANCES, columns=["speaker", "stime", "etime"])
+        overtalk_pct, silence_pct, duration = metrics_analyzer.calculate_call_metrics(
+            call_df
+        )
+        self.assertAlmostEqual(overtalk_pct, 2.0 / 12.0 * 100)
+        self.assertAlmostEqual(silence_pct, 0.0)
+        self.assertAlmostEqual(duration, 12.0)
+
+
+if __name__ == "__main__":
+    unittest.main()